@@ -1,4 +1,4 @@
 """
 Agentes do sistema.
 """
-from .cloud_pricing_agent import CloudPricingAgent
+from .cloud_pricing_agent import CloudPricingAgent, aclose_async_openai_client
@@ -0,0 +1,80 @@
+"""
+Formatação de Respostas do Roteador de Intenções
+
+Funções puras que transformam os resultados das ferramentas em texto para
+o usuário. Ficam isoladas neste módulo, com anotações de tipo completas e
+sem dependências do restante do projeto, para poderem ser compiladas como
+extensão nativa quando o volume de chamadas justificar:
+
+    mypyc src/agents/_format.py
+
+O Python importa o .so gerado no lugar deste arquivo; sem ele, o módulo
+roda normalmente como código interpretado.
+"""
+from typing import Optional
+
+
+def format_pricing_result(results: list[dict], provider: str, gpu_type: str) -> Optional[str]:
+    """
+    Lista as instâncias de uma GPU em um provedor, da mais barata à mais cara.
+
+    Args:
+        results: Resultados de search_gpu_pricing
+        provider: Provedor pedido (ex: "AWS")
+        gpu_type: GPU pedida (ex: "V100")
+
+    Returns:
+        str | None: Resposta formatada, ou None se nenhuma instância casa
+    """
+    instances: list[dict] = []
+    for result in results:
+        data: dict = result.get("data", {})
+        if result.get("provider") == provider and data.get("gpu_type") == gpu_type:
+            instances.append(data)
+    if not instances:
+        return None
+
+    instances.sort(key=lambda item: item["price_per_hour"])
+    lines: list[str] = [f"Preços de GPU {gpu_type} na {provider}:"]
+    for item in instances:
+        lines.append(
+            f"- {item['name']}: {item['gpu_count']}x {item['gpu_type']}, {item['vcpus']} vCPUs, "
+            f"{item['memory_gb']} GB - ${item['price_per_hour']:.2f}/hora ({item['region']})"
+        )
+    return "\n".join(lines)
+
+
+def format_comparison(comparison: dict, provider1: str, provider2: str, gpu_type: str) -> str:
+    """
+    Resume a comparação de preços entre dois provedores.
+
+    Args:
+        comparison: Campo "comparacao" de compare_cloud_prices
+        provider1: Primeiro provedor
+        provider2: Segundo provedor
+        gpu_type: GPU comparada
+
+    Returns:
+        str: Resposta formatada
+    """
+    price1: float = comparison[f"{provider1}_preco"]
+    price2: float = comparison[f"{provider2}_preco"]
+    return (
+        f"Comparação de GPU {gpu_type}: "
+        f"{provider1} ${price1:.2f}/hora vs {provider2} ${price2:.2f}/hora.\n"
+        f"Recomendação: {comparison['recomendacao']} (economia de {comparison['economia']})."
+    )
+
+
+def format_trend(trend: dict, provider: str) -> str:
+    """
+    Resume a tendência de mercado de um provedor.
+
+    Args:
+        trend: Entrada do provedor em get_market_trends
+        provider: Provedor consultado
+
+    Returns:
+        str: Resposta formatada
+    """
+    return f"Tendência de preços na {provider}: {trend['tendencia']}.\n{trend['analise']}"
@@ -10,14 +10,222 @@ O agente funciona como um "orquestrador inteligente" que:
 3. Coordena chamadas para ferramentas
 4. Sintetiza resultados em respostas estruturadas
 """
+import asyncio
+import functools
+import hashlib
+import json
+import re
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import AsyncIterator, Optional
+
+import httpx
 from agno.agent import Agent
 from agno.models.openai import OpenAIChat
+from agno.run.agent import RunContentEvent, RunErrorEvent
+from agno.run.base import RunStatus
 from agno.tools import Function
 from loguru import logger
+from openai import AsyncOpenAI, OpenAI
 
 from tools.search_tool import MockSearchTool
 from tools.vector_store import VectorStoreTool
 from tools.external_api import ExternalAPITool
+from utils.semantic_cache import SemanticCache
+
+from .intent_router import PROVIDER_NAMES, extract_entities, format_answer, route
+from .planner import PlannerAgent
+from .tool_executor import ParallelToolExecutor
+
+
+# Cache de respostas do agente, compartilhado pelo processo
+# Chave: hash da query normalizada -> (momento de criação, resposta final)
+# Perguntas repetidas (ex: "Quanto custa GPU V100 na AWS?") voltam direto
+# da memória, sem nova ida ao GPT-4 nem às ferramentas
+RESPONSE_CACHE_MAXSIZE = 1024
+RESPONSE_CACHE_TTL = 3600  # segundos
+
+_response_cache: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+_response_cache_lock = threading.Lock()
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+
+# Limite de resultados de ferramentas memoizados por agente (@ttl_memoize)
+TOOL_CACHE_MAXSIZE = 256
+
+# Início das respostas de erro/indisponibilidade das ferramentas (JSON
+# compacto com a chave "mensagem"), que não são memoizadas
+_TOOL_ERROR_PREFIX = '{"mensagem"'
+
+# Provedores citados na query, usados para disparar buscas especulativas
+_PROVIDER_RE = re.compile(r"\b(aws|azure|gcp)\b", re.IGNORECASE)
+
+
+def _normalize_query(query: str) -> str:
+    """Normaliza a query: minúsculas, sem pontuação e espaços colapsados."""
+    return " ".join(_PUNCTUATION_RE.sub(" ", query.lower()).split())
+
+
+def _response_cache_key(query: str) -> str:
+    """Gera a chave do cache de respostas para uma query."""
+    return hashlib.blake2b(_normalize_query(query).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _get_cached_response(key: str) -> Optional[str]:
+    """Retorna a resposta em cache, ou None se ausente/expirada."""
+    with _response_cache_lock:
+        entry = _response_cache.get(key)
+        if entry is None:
+            return None
+        created_at, response = entry
+        if time.monotonic() - created_at > RESPONSE_CACHE_TTL:
+            del _response_cache[key]
+            return None
+        # Marca como usada recentemente (política LRU)
+        _response_cache.move_to_end(key)
+        return response
+
+
+def _store_cached_response(key: str, response: str) -> None:
+    """Armazena uma resposta, descartando a menos usada se o cache encher."""
+    with _response_cache_lock:
+        _response_cache[key] = (time.monotonic(), response)
+        _response_cache.move_to_end(key)
+        while len(_response_cache) > RESPONSE_CACHE_MAXSIZE:
+            _response_cache.popitem(last=False)
+
+
+# Pool de conexões HTTP compartilhado com a OpenAI: todos os agentes (o
+# pool da API cria vários) reaproveitam conexões keep-alive já abertas
+# em vez de pagar um novo handshake TLS por instância
+_HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+_HTTP_TIMEOUT = 30.0  # segundos
+
+# Clientes async por event loop: conexões async pertencem ao loop que as
+# abriu, e analyze_query cria um loop novo a cada chamada (asyncio.run).
+# Quem executa um loop de uso único deve fechar o cliente ao final (ver
+# aclose_async_openai_client)
+_async_openai_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_openai_client() -> OpenAI:
+    """Cliente OpenAI do processo, criado na primeira utilização."""
+    return OpenAI(timeout=_HTTP_TIMEOUT, http_client=httpx.Client(limits=_HTTP_LIMITS))
+
+
+def _get_async_openai_client() -> AsyncOpenAI:
+    """Cliente OpenAI async compartilhado pelo event loop atual."""
+    loop = asyncio.get_running_loop()
+    client = _async_openai_clients.get(loop)
+    if client is None:
+        client = AsyncOpenAI(timeout=_HTTP_TIMEOUT, http_client=httpx.AsyncClient(limits=_HTTP_LIMITS))
+        _async_openai_clients[loop] = client
+    return client
+
+
+async def aclose_async_openai_client() -> None:
+    """
+    Fecha o cliente OpenAI async do event loop atual, se houver.
+
+    Deve ser aguardado antes do fim de um loop de uso único (asyncio.run,
+    uvloop.run): sem isso o cliente e seu pool de conexões httpx ficam
+    órfãos, e o coletor de lixo tenta fechá-los depois com o loop já
+    encerrado ("Event loop is closed").
+    """
+    client = _async_openai_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
+
+
+@functools.lru_cache(maxsize=1)
+def _get_shared_tools() -> tuple[MockSearchTool, VectorStoreTool, ExternalAPITool]:
+    """
+    Ferramentas do processo, criadas na primeira utilização.
+
+    As ferramentas são de leitura e não guardam estado por requisição, então
+    todos os agentes (o pool da API cria vários) usam as mesmas instâncias:
+    um único modelo de embedding carregado, caches de resultados não
+    divididos entre agentes e uma única carga inicial do ChromaDB.
+    """
+    return MockSearchTool(), VectorStoreTool(), ExternalAPITool()
+
+
+@functools.lru_cache(maxsize=1)
+def _get_semantic_cache() -> SemanticCache:
+    """Cache semântico do processo, com o modelo de embedding da base de conhecimento."""
+    _, vector_store, _ = _get_shared_tools()
+    return SemanticCache(vector_store.embed_cached, entities=extract_entities)
+
+
+def ttl_memoize(ttl: float = 300):
+    """
+    Memoiza o resultado de um wrapper de ferramenta por `ttl` segundos.
+
+    Dentro de um mesmo chain-of-thought o LLM costuma repetir chamadas com
+    os mesmos argumentos (ex: search_gpu_pricing("V100") duas vezes). O
+    resultado fica em `self._tool_cache` da instância do agente, com chave
+    derivada de (nome da função, argumentos). Em um acerto a ferramenta não
+    é executada novamente.
+
+    Chamadas idênticas simultâneas (ex: uma chamada especulativa ainda em
+    andamento quando o LLM pede o mesmo dado) aguardam a mesma execução,
+    registrada em `self._tool_inflight`.
+
+    O cache é um LRU limitado a TOOL_CACHE_MAXSIZE entradas (o agente do
+    pool vive tanto quanto a API e os argumentos vêm do LLM, então as chaves
+    não se repetem indefinidamente). Respostas de erro/indisponibilidade
+    ({"mensagem": ...}) não são memoizadas, para que a próxima chamada
+    tente de novo.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(self, *args, **kwargs):
+            key = repr((fn.__name__, args, sorted(kwargs.items())))
+            cache = self._tool_cache
+            entry = cache.get(key)
+            if entry is not None:
+                if time.monotonic() - entry[0] <= ttl:
+                    cache.move_to_end(key)
+                    return entry[1]
+                del cache[key]
+
+            # Mesma chamada já em execução: aguarda o resultado dela
+            # (shield para que o cancelamento deste chamador não a interrompa)
+            inflight = self._tool_inflight.get(key)
+            if inflight is not None:
+                return await asyncio.shield(inflight)
+
+            task = asyncio.ensure_future(fn(self, *args, **kwargs))
+            self._tool_inflight[key] = task
+            try:
+                result = await task
+            finally:
+                self._tool_inflight.pop(key, None)
+
+            if not result.startswith(_TOOL_ERROR_PREFIX):
+                cache[key] = (time.monotonic(), result)
+                if len(cache) > TOOL_CACHE_MAXSIZE:
+                    cache.popitem(last=False)
+            return result
+        return wrapper
+    return decorator
+
+
+def bounded(fn):
+    """
+    Executa o wrapper de ferramenta pelo ParallelToolExecutor do agente.
+
+    Limita quantas ferramentas rodam ao mesmo tempo quando o LLM dispara
+    várias chamadas em paralelo, e refaz erros transitórios (429/5xx).
+    """
+    @functools.wraps(fn)
+    async def wrapper(self, *args, **kwargs):
+        return await self._tool_executor.run(fn, self, *args, **kwargs)
+    return wrapper
 
 
 class CloudPricingAgent:
@@ -39,24 +247,124 @@ class CloudPricingAgent:
         agent: Instância do agente Agno
     """
 
-    def __init__(self):
+    # Modelo de linguagem (sempre GPT-4 para consistência)
+    _MODEL_ID = "gpt-4"
+
+    # Especificação das ferramentas: (nome do wrapper, descrição para o LLM,
+    # JSON Schema dos parâmetros). Metadados fixos, definidos uma única vez
+    # para todas as instâncias; com o schema pronto o Agno não precisa
+    # inspecionar as assinaturas dos wrappers a cada agente criado
+    _TOOL_SPECS = (
+        (
+            "search_gpu_pricing",
+            "Busca preços de GPU nos provedores AWS, Azure e GCP",
+            {
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string", "description": "Termo de busca (ex: 'V100', 'AWS')"},
+                    "gpu_type": {"type": "string", "description": "Filtra pelo tipo exato de GPU (ex: 'A100')"},
+                    "min_gpu_count": {"type": "integer", "description": "Quantidade mínima de GPUs"},
+                    "max_price": {"type": "number", "description": "Preço máximo por hora, em USD"},
+                },
+                "required": [],
+            },
+        ),
+        (
+            "compare_cloud_prices",
+            "Compara preços entre dois provedores de nuvem",
+            {
+                "type": "object",
+                "properties": {
+                    "provider1": {"type": "string", "description": "Primeiro provedor (AWS, Azure ou GCP)"},
+                    "provider2": {"type": "string", "description": "Segundo provedor (AWS, Azure ou GCP)"},
+                    "gpu_type": {"type": "string", "description": "Tipo de GPU (ex: 'V100', 'K80')"},
+                },
+                "required": ["provider1", "provider2"],
+            },
+        ),
+        (
+            "get_market_trends",
+            "Obtém tendências de mercado e análise de preços",
+            {
+                "type": "object",
+                "properties": {"provider": {"type": "string", "description": "Provedor ou 'all' para todos"}},
+                "required": [],
+            },
+        ),
+        (
+            "search_knowledge_base",
+            "Busca informações sobre otimização de custos na nuvem",
+            {
+                "type": "object",
+                "properties": {"query": {"type": "string", "description": "Pergunta sobre otimização de custos"}},
+                "required": ["query"],
+            },
+        ),
+    )
+
+    # Instruções claras para o agente
+    _INSTRUCTIONS = """
+        Você é um especialista em preços de nuvem focado em GPUs.
+
+        SUAS FERRAMENTAS:
+        - search_gpu_pricing: Busca preços de GPU nos provedores AWS, Azure, GCP
+        - compare_cloud_prices: Compara preços entre dois provedores
+        - get_market_trends: Obtém tendências de mercado
+        - search_knowledge_base: Busca dicas de otimização de custos
+
+        SEMPRE:
+        1. Use as ferramentas disponíveis para obter dados
+        2. Forneça respostas estruturadas e claras
+        3. Compare preços quando possível
+        4. Sugira a opção mais econômica
+        5. Explique seu raciocínio passo a passo
+        """
+
+    def __init__(self, use_cache: bool = True):
         """
         Inicializa o agente com suas 3 ferramentas essenciais.
 
         Este método configura todo o ecossistema do agente:
-        1. Cria instâncias das 3 ferramentas
+        1. Obtém as 3 ferramentas (compartilhadas pelo processo)
         2. Inicializa o agente Agno com GPT-4
         3. Registra todas as funções como ferramentas disponíveis
+
+        Args:
+            use_cache: Se False, toda query passa pelo LLM (sem cache exato
+                nem semântico de respostas)
         """
-        # Inicializa as 3 ferramentas do agente
-        # Cada ferramenta representa uma fonte diferente de conhecimento
-        self.search_tool = MockSearchTool()     # Busca em dados JSON locais
-        self.vector_store = VectorStoreTool()   # Busca semântica na base vetorial
-        self.external_api = ExternalAPITool()   # API externa para comparações
+        # As 3 ferramentas do agente, compartilhadas por todos os agentes do
+        # processo; cada agente mantém só o próprio estado do LLM (Agno)
+        # Cada ferramenta representa uma fonte diferente de conhecimento:
+        # busca em dados JSON locais, busca semântica na base vetorial e
+        # API externa para comparações
+        self.search_tool, self.vector_store, self.external_api = _get_shared_tools()
+
+        # Cache dos resultados das ferramentas (preenchido por @ttl_memoize)
+        # e chamadas em andamento, compartilhadas entre chamadores idênticos
+        self._tool_cache: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        self._tool_inflight: dict[str, asyncio.Future] = {}
+
+        # Limita chamadas simultâneas de ferramentas (usado por @bounded)
+        self._tool_executor = ParallelToolExecutor(max_concurrency=8)
+
+        # Cache de respostas: exato (processo) e semântico (ChromaDB, com o
+        # mesmo modelo de embedding da base de conhecimento)
+        self.use_cache = use_cache
+        self.semantic_cache = _get_semantic_cache() if use_cache else None
 
         # Cria o agente Agno com modelo e ferramentas
         self.agent = self._create_agent()
 
+        # Planejador: gera todas as chamadas de ferramentas de uma vez (DAG)
+        # e as executa em paralelo; o agente Agno fica como alternativa
+        self.planner = PlannerAgent(
+            client=_get_openai_client(),
+            model_id=self._MODEL_ID,
+            tools={name: getattr(self, name) for name, _, _ in self._TOOL_SPECS},
+            descriptions={name: description for name, description, _ in self._TOOL_SPECS},
+        )
+
         logger.info("Agente de precificação inicializado com sucesso")
 
     def _create_agent(self) -> Agent:
@@ -73,64 +381,41 @@ class CloudPricingAgent:
             Agent: Instância configurada do agente Agno
         """
         # Define o modelo de linguagem (sempre GPT-4 para consistência)
-        model = OpenAIChat(id="gpt-4")
+        # O cliente sync é o do processo; o async é associado a cada
+        # chamada (ver _bind_async_client)
+        model = OpenAIChat(id=self._MODEL_ID, client=_get_openai_client())
 
         # Registra as ferramentas como funções que o LLM pode chamar
-        # Cada Function representa uma "habilidade" que o agente pode usar
-
-        search_tool = Function(
-            fn=self.search_gpu_pricing,           # Função Python a ser chamada
-            name="search_gpu_pricing",            # Nome que o LLM vê
-            description="Busca preços de GPU nos provedores AWS, Azure e GCP"  # Descrição para o LLM
-        )
-
-        compare_tool = Function(
-            fn=self.compare_cloud_prices,
-            name="compare_cloud_prices",
-            description="Compara preços entre dois provedores de nuvem"
-        )
-
-        trends_tool = Function(
-            fn=self.get_market_trends,
-            name="get_market_trends",
-            description="Obtém tendências de mercado e análise de preços"
-        )
-
-        knowledge_tool = Function(
-            fn=self.search_knowledge_base,
-            name="search_knowledge_base",
-            description="Busca informações sobre otimização de custos na nuvem"
-        )
+        # Cada Function representa uma "habilidade" que o agente pode usar.
+        # Os wrappers são async: quando o LLM emite várias chamadas no mesmo
+        # turno, o Agno (via arun) as executa em paralelo com asyncio.gather,
+        # então a latência do turno é a da ferramenta mais lenta, não a soma.
+        # Nomes, descrições e schemas vêm de _TOOL_SPECS; só o vínculo com
+        # self é feito por instância
+        tools = [
+            Function(
+                entrypoint=getattr(self, name),   # Wrapper async desta instância
+                name=name,                        # Nome que o LLM vê
+                description=description,          # Descrição para o LLM
+                parameters=parameters,            # Schema pré-calculado
+                skip_entrypoint_processing=True   # Dispensa a introspecção
+            )
+            for name, description, parameters in self._TOOL_SPECS
+        ]
 
         # Cria o agente Agno com todas as configurações
         agent = Agent(
             model=model,                          # Modelo LLM (GPT-4)
-            tools=[search_tool, compare_tool, trends_tool, knowledge_tool],  # Ferramentas disponíveis
-            instructions=self._get_instructions() # Instruções do sistema
+            tools=tools,                          # Ferramentas disponíveis
+            instructions=self._INSTRUCTIONS       # Instruções do sistema
         )
 
         return agent
 
-    def _get_instructions(self) -> str:
-        """Instruções claras para o agente."""
-        return """
-        Você é um especialista em preços de nuvem focado em GPUs.
-
-        SUAS FERRAMENTAS:
-        - search_gpu_pricing: Busca preços de GPU nos provedores AWS, Azure, GCP
-        - compare_cloud_prices: Compara preços entre dois provedores
-        - get_market_trends: Obtém tendências de mercado
-        - search_knowledge_base: Busca dicas de otimização de custos
-
-        SEMPRE:
-        1. Use as ferramentas disponíveis para obter dados
-        2. Forneça respostas estruturadas e claras
-        3. Compare preços quando possível
-        4. Sugira a opção mais econômica
-        5. Explique seu raciocínio passo a passo
-        """
-
-    def search_gpu_pricing(self, query: str) -> str:
+    @ttl_memoize(ttl=300)
+    @bounded
+    async def search_gpu_pricing(self, query: str = "", gpu_type: str = "", min_gpu_count: int = 0,
+                                 max_price: float = 0.0) -> str:
         """
         Wrapper para busca de preços - chamado automaticamente pelo LLM.
 
@@ -139,15 +424,20 @@ class CloudPricingAgent:
 
         Args:
             query: Termo de busca fornecido pelo LLM
+            gpu_type: Filtro opcional pelo tipo exato de GPU
+            min_gpu_count: Filtro opcional de quantidade mínima de GPUs
+            max_price: Filtro opcional de preço máximo por hora
 
         Returns:
             str: Resultados da busca em JSON
         """
-        logger.info(f"Executando busca de preços: '{query}'")
-        # Delega para a ferramenta especializada
-        return self.search_tool.search_gpu_pricing(query)
+        logger.debug(f"Executando busca de preços: '{query}'")
+        # Delega para a ferramenta especializada (busca em memória, não bloqueia)
+        return self.search_tool.search_gpu_pricing(query, gpu_type, min_gpu_count, max_price)
 
-    def compare_cloud_prices(self, provider1: str, provider2: str, gpu_type: str = "") -> str:
+    @ttl_memoize(ttl=300)
+    @bounded
+    async def compare_cloud_prices(self, provider1: str, provider2: str, gpu_type: str = "") -> str:
         """
         Wrapper para comparação de preços - chamado automaticamente pelo LLM.
 
@@ -162,11 +452,13 @@ class CloudPricingAgent:
         Returns:
             str: Resultados da comparação em JSON
         """
-        logger.info(f"Executando comparação: {provider1} vs {provider2} para {gpu_type}")
-        # Delega para a ferramenta especializada
+        logger.debug(f"Executando comparação: {provider1} vs {provider2} para {gpu_type}")
+        # Delega para a ferramenta especializada (simulação local, não bloqueia)
         return self.external_api.compare_prices(provider1, provider2, gpu_type)
 
-    def get_market_trends(self, provider: str = "all") -> str:
+    @ttl_memoize(ttl=300)
+    @bounded
+    async def get_market_trends(self, provider: str = "all") -> str:
         """
         Wrapper para tendências de mercado - chamado automaticamente pelo LLM.
 
@@ -179,11 +471,13 @@ class CloudPricingAgent:
         Returns:
             str: Tendências de mercado em JSON
         """
-        logger.info(f"Consultando tendências para: {provider}")
-        # Delega para a ferramenta especializada
+        logger.debug(f"Consultando tendências para: {provider}")
+        # Delega para a ferramenta especializada (simulação local, não bloqueia)
         return self.external_api.get_market_trends(provider)
 
-    def search_knowledge_base(self, query: str) -> str:
+    @ttl_memoize(ttl=300)
+    @bounded
+    async def search_knowledge_base(self, query: str) -> str:
         """
         Wrapper para busca na base de conhecimento - chamado automaticamente pelo LLM.
 
@@ -196,14 +490,183 @@ class CloudPricingAgent:
         Returns:
             str: Documentos relevantes encontrados em JSON
         """
-        logger.info(f"Buscando conhecimento sobre: '{query}'")
-        # Delega para a ferramenta especializada
-        return self.vector_store.search_similar(query)
+        logger.debug(f"Buscando conhecimento sobre: '{query}'")
+        # A consulta ao ChromaDB (embedding + busca) é bloqueante, então roda
+        # em uma thread para não travar o event loop das outras ferramentas.
+        # Perguntas já vistas voltam do cache de resultados da VectorStoreTool
+        return await asyncio.to_thread(self.vector_store.search_similar, query)
+
+    def clear_tool_cache(self) -> None:
+        """Invalida o cache de resultados das ferramentas."""
+        self._tool_cache.clear()
+
+    def _start_speculative_calls(self, user_query: str) -> list[asyncio.Task]:
+        """
+        Dispara buscas de preço prováveis antes de o LLM pedi-las.
+
+        Queries que citam um provedor ("Quanto custa ... na AWS?") quase
+        sempre começam com search_gpu_pricing para esse provedor. A busca
+        roda enquanto o GPT-4 ainda decide o que fazer; se o LLM fizer a
+        mesma chamada, reaproveita a execução em andamento ou o resultado
+        já em cache (ver ttl_memoize).
+
+        Args:
+            user_query: Pergunta do usuário
+
+        Returns:
+            list[asyncio.Task]: Tarefas especulativas disparadas
+        """
+        providers = sorted({PROVIDER_NAMES[match.lower()] for match in _PROVIDER_RE.findall(user_query)})
+        if providers:
+            logger.debug(f"Buscas especulativas para: {providers}")
+        # Mesmos argumentos nomeados que o Agno usa ao chamar a ferramenta
+        return [asyncio.create_task(self.search_gpu_pricing(query=provider)) for provider in providers]
+
+    @staticmethod
+    def _finish_speculative_calls(tasks: list[asyncio.Task]) -> None:
+        """Cancela especulações não usadas e descarta seus erros."""
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                # Consome a exceção (se houver) para não gerar aviso do asyncio
+                task.exception()
+
+    def _get_cached(self, cache_key: str) -> Optional[str]:
+        """Consulta o cache exato de respostas, se habilitado."""
+        return _get_cached_response(cache_key) if self.use_cache else None
+
+    def _store_cached(self, cache_key: str, response: str) -> None:
+        """Armazena no cache exato de respostas, se habilitado."""
+        if self.use_cache:
+            _store_cached_response(cache_key, response)
+
+    async def _get_semantic(self, user_query: str) -> Optional[str]:
+        """
+        Consulta o cache semântico (perguntas equivalentes já respondidas).
+
+        Falhas do cache não interrompem a query: ela segue para o LLM.
+        """
+        if self.semantic_cache is None:
+            return None
+        try:
+            return await asyncio.to_thread(self.semantic_cache.get, user_query)
+        except Exception as e:
+            logger.warning(f"Falha ao consultar o cache semântico: {e}")
+            return None
+
+    async def _store_semantic(self, user_query: str, response: str) -> None:
+        """Armazena a resposta do LLM no cache semântico."""
+        if self.semantic_cache is None:
+            return
+        try:
+            await asyncio.to_thread(self.semantic_cache.set, user_query, response)
+        except Exception as e:
+            logger.warning(f"Falha ao gravar no cache semântico: {e}")
+
+    async def _try_route(self, user_query: str) -> Optional[str]:
+        """
+        Responde perguntas triviais sem o GPT-4, usando o roteador de intenções.
 
-    def analyze_query(self, user_query: str) -> str:
+        Se a pergunta casa com um padrão conhecido, a ferramenta correspondente
+        é chamada diretamente e seu resultado é formatado. Qualquer falha ou
+        resultado vazio devolve None, e a pergunta segue para o agente.
+
+        Args:
+            user_query: Pergunta do usuário
+
+        Returns:
+            str | None: Resposta pronta, ou None se o LLM é necessário
+        """
+        intent = route(user_query)
+        if intent is None:
+            return None
+
+        tool_name, arguments = intent
+        try:
+            tool_result = await getattr(self, tool_name)(**arguments)
+            answer = format_answer(tool_name, arguments, tool_result)
+        except Exception as e:
+            logger.warning(f"Roteamento direto falhou ({tool_name}), usando o agente: {e}")
+            return None
+
+        if answer is not None:
+            logger.info(f"Query respondida pelo roteador de intenções ({tool_name})")
+        return answer
+
+    def _bind_async_client(self) -> None:
+        """Faz o modelo do agente usar o cliente async compartilhado do loop atual."""
+        self.agent.model.async_client = _get_async_openai_client()
+
+    async def _planner_execute(self, user_query: str, max_tokens: Optional[int] = None) -> tuple[str, bool]:
+        """
+        Responde a query pelo PlannerAgent, recorrendo ao agente Agno se o plano falhar.
+
+        O planejador faz duas chamadas ao LLM (plano e síntese) e executa
+        todas as ferramentas independentes em paralelo, em vez de uma ida
+        ao modelo por rodada de ferramentas.
+
+        Args:
+            user_query: Pergunta do usuário
+            max_tokens: Limite de tokens da resposta final (None = sem limite)
+
+        Returns:
+            tuple[str, bool]: (resposta, se a execução foi bem-sucedida)
+        """
+        try:
+            return await self.planner.run(user_query, max_tokens=max_tokens), True
+        except Exception as e:
+            # Plano malformado, argumentos inválidos para uma ferramenta,
+            # referência "$<id>" a um nó fora de "deps" ou falha na chamada
+            # ao LLM: qualquer erro do planejador recorre ao agente Agno
+            logger.warning(f"Falha no planejador ({type(e).__name__}), usando o agente Agno: {e}")
+
+        # O agente Agno processa a query e usa ferramentas automaticamente.
+        # Usa arun porque as ferramentas são async (executadas em paralelo)
+        self._bind_async_client()
+        # O agente do pool é exclusivo desta execução, então o limite pode
+        # ser aplicado ao modelo e desfeito ao final
+        default_max_tokens = self.agent.model.max_tokens
+        if max_tokens is not None:
+            self.agent.model.max_tokens = max_tokens
+        try:
+            response = await self.agent.arun(user_query)
+        finally:
+            self.agent.model.max_tokens = default_max_tokens
+
+        # Extrai o conteúdo da resposta; o Agno devolve falhas do modelo
+        # como uma execução com status de erro
+        final_response = response.content if hasattr(response, 'content') else str(response)
+        return final_response, getattr(response, "status", None) != RunStatus.error
+
+    def analyze_query(self, user_query: str, max_tokens: Optional[int] = None) -> str:
         """
         MÉTODO PRINCIPAL: Processa queries do usuário usando o agente Agno.
 
+        Versão síncrona de aanalyze_query, para uso fora de um event loop
+        (CLI e scripts). Código async (ex: a API FastAPI) deve usar
+        aanalyze_query diretamente.
+
+        Args:
+            user_query: Pergunta do usuário (ex: "Quanto custa GPU na AWS?")
+            max_tokens: Limite de tokens da resposta gerada pelo LLM (None = sem limite)
+
+        Returns:
+            str: Resposta estruturada do agente
+        """
+        async def run() -> str:
+            try:
+                return await self.aanalyze_query(user_query, max_tokens=max_tokens)
+            finally:
+                # O loop criado por asyncio.run termina aqui
+                await aclose_async_openai_client()
+
+        return asyncio.run(run())
+
+    async def aanalyze_query(self, user_query: str, max_tokens: Optional[int] = None) -> str:
+        """
+        Processa queries do usuário usando o agente Agno (versão async).
+
         Este é o ponto de entrada principal da aplicação. O agente:
         1. Recebe a query do usuário em linguagem natural
         2. Decide automaticamente quais ferramentas usar (chain-of-thought)
@@ -216,19 +679,47 @@ class CloudPricingAgent:
 
         Args:
             user_query: Pergunta do usuário (ex: "Quanto custa GPU na AWS?")
+            max_tokens: Limite de tokens da resposta gerada pelo LLM (None =
+                sem limite). Respostas limitadas podem vir truncadas e não
+                entram nos caches
 
         Returns:
             str: Resposta estruturada do agente
         """
         logger.info(f"Iniciando análise da query: '{user_query}'")
 
+        # Consulta o cache antes de acionar o LLM
+        cache_key = _response_cache_key(user_query)
+        cached_response = self._get_cached(cache_key)
+        if cached_response is not None:
+            logger.info("Resposta obtida do cache")
+            return cached_response
+
+        # Perguntas triviais (uma única ferramenta) dispensam o LLM
+        routed_response = await self._try_route(user_query)
+        if routed_response is not None:
+            self._store_cached(cache_key, routed_response)
+            return routed_response
+
+        # Pergunta equivalente (outra redação) já respondida pelo LLM
+        cached_response = await self._get_semantic(user_query)
+        if cached_response is not None:
+            logger.info("Resposta obtida do cache semântico")
+            self._store_cached(cache_key, cached_response)
+            return cached_response
+
+        # Adianta a busca de preço mais provável enquanto o LLM raciocina
+        speculative_calls = self._start_speculative_calls(user_query)
+
         try:
-            # O agente Agno processa a query e usa ferramentas automaticamente
-            # Esta é a chamada principal que dispara todo o chain-of-thought
-            response = self.agent.run(user_query)
+            # Planeja e executa as ferramentas; esta é a chamada principal
+            # que dispara todo o chain-of-thought
+            final_response, succeeded = await self._planner_execute(user_query, max_tokens=max_tokens)
 
-            # Extrai o conteúdo da resposta
-            final_response = response.content if hasattr(response, 'content') else str(response)
+            # Só respostas bem-sucedidas e completas entram no cache
+            if succeeded and max_tokens is None:
+                self._store_cached(cache_key, final_response)
+                await self._store_semantic(user_query, final_response)
 
             logger.info("Análise da query concluída com sucesso")
             return final_response
@@ -237,3 +728,158 @@ class CloudPricingAgent:
             # Tratamento robusto de erros
             logger.error(f"Erro durante análise da query: {e}")
             return f"Erro ao processar query: {str(e)}"
+
+        finally:
+            self._finish_speculative_calls(speculative_calls)
+
+    async def astream_query(self, user_query: str) -> AsyncIterator[str]:
+        """
+        Processa a query como aanalyze_query, mas emite a resposta aos poucos.
+
+        Em vez de esperar a resposta completa do GPT-4, cada trecho de texto
+        é repassado assim que o modelo o gera, reduzindo o tempo até o
+        primeiro token percebido pelo usuário.
+
+        Args:
+            user_query: Pergunta do usuário
+
+        Yields:
+            str: Trechos (deltas) da resposta do agente
+        """
+        logger.info(f"Iniciando análise em streaming da query: '{user_query}'")
+
+        # Respostas em cache são emitidas de uma vez
+        cache_key = _response_cache_key(user_query)
+        cached_response = self._get_cached(cache_key)
+        if cached_response is not None:
+            logger.info("Resposta obtida do cache")
+            yield cached_response
+            return
+
+        routed_response = await self._try_route(user_query)
+        if routed_response is not None:
+            self._store_cached(cache_key, routed_response)
+            yield routed_response
+            return
+
+        cached_response = await self._get_semantic(user_query)
+        if cached_response is not None:
+            logger.info("Resposta obtida do cache semântico")
+            self._store_cached(cache_key, cached_response)
+            yield cached_response
+            return
+
+        parts = []
+        failed = False
+        speculative_calls = self._start_speculative_calls(user_query)
+        try:
+            self._bind_async_client()
+            async for event in self.agent.arun(user_query, stream=True):
+                if isinstance(event, RunErrorEvent):
+                    # Mesmo comportamento de aanalyze_query: a mensagem de erro
+                    # do Agno vira o conteúdo da resposta
+                    failed = True
+                    if event.content:
+                        yield str(event.content)
+                elif isinstance(event, RunContentEvent) and isinstance(event.content, str) and event.content:
+                    parts.append(event.content)
+                    yield event.content
+        finally:
+            self._finish_speculative_calls(speculative_calls)
+
+        # Só respostas completas, bem-sucedidas e não vazias entram no cache
+        # (um stream sem eventos de conteúdo deixaria a pergunta respondendo
+        # "" até o TTL expirar)
+        final_response = "".join(parts)
+        if not failed and final_response.strip():
+            self._store_cached(cache_key, final_response)
+            await self._store_semantic(user_query, final_response)
+        logger.info("Análise em streaming concluída")
+
+    def submit_batch(self, questions: list[str]) -> str:
+        """
+        Envia várias perguntas para a Batch API da OpenAI.
+
+        Para avaliações em lote e análises offline, a Batch API custa metade
+        do preço e tem limites de taxa maiores, com resultado em até 24h.
+        Cada pergunta vira uma linha do arquivo JSONL de entrada.
+
+        Observação: o modo batch é uma chamada direta ao modelo, sem o loop
+        de ferramentas do Agno, então as respostas usam apenas as instruções
+        do sistema.
+
+        Args:
+            questions: Lista de perguntas do usuário
+
+        Returns:
+            str: ID do batch criado na OpenAI
+        """
+        logger.info(f"Enviando batch com {len(questions)} perguntas")
+
+        # Uma requisição de chat completion por pergunta
+        # custom_id permite associar cada resposta à pergunta original
+        lines = [
+            json.dumps({
+                "custom_id": f"q-{index}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self._MODEL_ID,
+                    "messages": [
+                        {"role": "system", "content": self._INSTRUCTIONS},
+                        {"role": "user", "content": question}
+                    ]
+                }
+            }, ensure_ascii=False)
+            for index, question in enumerate(questions)
+        ]
+
+        client = _get_openai_client()
+        input_file = client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+
+        logger.info(f"Batch {batch.id} criado")
+        return batch.id
+
+    def get_batch(self, batch_id: str) -> dict:
+        """
+        Consulta o status de um batch e, se concluído, suas respostas.
+
+        Args:
+            batch_id: ID retornado por submit_batch
+
+        Returns:
+            dict: Status do batch e, quando concluído, as respostas por índice
+        """
+        client = _get_openai_client()
+        batch = client.batches.retrieve(batch_id)
+        result = {"batch_id": batch.id, "status": batch.status}
+
+        if batch.status != "completed" or not batch.output_file_id:
+            return result
+
+        # Cada linha do arquivo de saída é um BatchResponseLine
+        answers = []
+        output = client.files.content(batch.output_file_id).text
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            index = int(item["custom_id"].split("-", 1)[1])
+            response = item.get("response") or {}
+            if item.get("error") or response.get("status_code") != 200:
+                answers.append({"index": index, "error": item.get("error") or response.get("body")})
+            else:
+                content = response["body"]["choices"][0]["message"]["content"]
+                answers.append({"index": index, "answer": content})
+
+        result["answers"] = sorted(answers, key=lambda answer: answer["index"])
+        logger.info(f"Batch {batch_id} concluído com {len(answers)} respostas")
+        return result
@@ -0,0 +1,143 @@
+"""
+Roteador de Intenções (intent router)
+
+Muitas perguntas feitas ao agente equivalem a uma única chamada de
+ferramenta (ex: "Quanto custa GPU V100 na AWS?" -> search_gpu_pricing).
+Passar essas perguntas pelo GPT-4 só para ele emitir a chamada custa ~1s e
+tokens. Este módulo reconhece esses formatos com expressões regulares
+pré-compiladas e indica qual ferramenta chamar, além de formatar a resposta
+diretamente a partir do resultado da ferramenta.
+
+Perguntas que não casam com nenhum padrão seguem para o agente normalmente.
+"""
+import re
+from typing import Optional
+
+import orjson
+
+from ._format import format_comparison, format_pricing_result, format_trend
+
+
+# Nomes canônicos dos provedores, como aparecem nos dados das ferramentas
+PROVIDER_NAMES = {"aws": "AWS", "azure": "Azure", "gcp": "GCP"}
+
+_PROVIDER = r"(?P<{name}>aws|azure|gcp)"
+_GPU = r"(?:a\s+)?(?:gpu\s+)?(?P<gpu>v100|k80|a100|t4|p100)"
+
+# Provedores e GPUs citados em qualquer ponto da pergunta (extract_entities)
+_ENTITY_RE = re.compile(r"\b(aws|azure|gcp|v100|k80|a100|t4|p100)\b", re.IGNORECASE)
+
+# Padrões ancorados (pergunta inteira), do mais específico ao mais geral
+_ROUTES = (
+    # "Quanto custa (uma) GPU V100 na AWS?" / "Qual é o preço da GPU K80 na Azure?"
+    (
+        "search_gpu_pricing",
+        re.compile(
+            r"^\s*(?:quanto custa|qual\s+(?:é\s+)?o\s+pre[çc]o\s+d[ae])\s+(?:uma\s+)?"
+            + _GPU + r"\s+(?:na|no|em)\s+" + _PROVIDER.format(name="provider") + r"\s*\??\s*$",
+            re.IGNORECASE,
+        ),
+    ),
+    # "Qual é mais barato: AWS ou Azure para GPU K80?"
+    (
+        "compare_cloud_prices",
+        re.compile(
+            r"^\s*qual\s+(?:é\s+)?(?:o\s+)?mais\s+barat[oa]\s*:?\s*"
+            + _PROVIDER.format(name="provider1") + r"\s+ou\s+" + _PROVIDER.format(name="provider2")
+            + r"\s+(?:para|com)\s+" + _GPU + r"\s*\??\s*$",
+            re.IGNORECASE,
+        ),
+    ),
+    # "Qual a tendência de preços da AWS?" / "Tendências de mercado no GCP"
+    (
+        "get_market_trends",
+        re.compile(
+            r"^\s*(?:qual\s+(?:é\s+)?a\s+|quais\s+s[ãa]o\s+as\s+)?tend[êe]ncias?\s+"
+            r"(?:de\s+(?:pre[çc]os?|mercado)\s+)?(?:d[aeo]|na|no|para\s+(?:a\s+|o\s+)?)\s*"
+            + _PROVIDER.format(name="provider") + r"\s*\??\s*$",
+            re.IGNORECASE,
+        ),
+    ),
+)
+
+
+def route(query: str) -> Optional[tuple[str, dict]]:
+    """
+    Identifica se a pergunta pode ser respondida por uma única ferramenta.
+
+    Args:
+        query: Pergunta do usuário
+
+    Returns:
+        tuple[str, dict] | None: (nome da ferramenta, argumentos nomeados), ou
+            None se a pergunta precisa do raciocínio do LLM
+    """
+    for tool_name, pattern in _ROUTES:
+        match = pattern.match(query)
+        if match is None:
+            continue
+
+        groups = match.groupdict()
+        if tool_name == "search_gpu_pricing":
+            provider = PROVIDER_NAMES[groups["provider"].lower()]
+            return tool_name, {"query": f"{provider} {groups['gpu'].upper()}"}
+        if tool_name == "compare_cloud_prices":
+            return tool_name, {
+                "provider1": PROVIDER_NAMES[groups["provider1"].lower()],
+                "provider2": PROVIDER_NAMES[groups["provider2"].lower()],
+                "gpu_type": groups["gpu"].upper(),
+            }
+        return tool_name, {"provider": PROVIDER_NAMES[groups["provider"].lower()]}
+
+    return None
+
+
+def extract_entities(query: str) -> str:
+    """
+    Extrai os provedores e GPUs citados na pergunta.
+
+    Perguntas com embeddings muito próximos podem diferir só na entidade
+    ("V100 na AWS" x "V100 na Azure"); o cache semântico compara este valor
+    antes de aceitar um acerto.
+
+    Args:
+        query: Pergunta do usuário
+
+    Returns:
+        str: Entidades em minúsculas, ordenadas e separadas por espaço
+            (vazio se a pergunta não cita nenhuma)
+    """
+    return " ".join(sorted({match.lower() for match in _ENTITY_RE.findall(query)}))
+
+
+def format_answer(tool_name: str, arguments: dict, tool_result: str) -> Optional[str]:
+    """
+    Converte o resultado JSON da ferramenta em uma resposta para o usuário.
+
+    Args:
+        tool_name: Ferramenta chamada (retornada por route)
+        arguments: Argumentos usados na chamada
+        tool_result: Resultado JSON da ferramenta
+
+    Returns:
+        str | None: Resposta formatada, ou None se o resultado não responde
+            a pergunta (nesse caso o agente LLM deve ser usado)
+    """
+    data = orjson.loads(tool_result)
+
+    if tool_name == "search_gpu_pricing":
+        if not isinstance(data, list):
+            return None
+        provider, gpu_type = arguments["query"].split()
+        return format_pricing_result(data, provider, gpu_type)
+
+    if tool_name == "compare_cloud_prices":
+        comparison = data.get("comparacao")
+        if not comparison:
+            return None
+        return format_comparison(comparison, arguments["provider1"], arguments["provider2"], arguments["gpu_type"])
+
+    trend = data.get(arguments["provider"])
+    if not trend:
+        return None
+    return format_trend(trend, arguments["provider"])
@@ -0,0 +1,227 @@
+"""
+Planejador de Chamadas de Ferramentas (PlannerAgent, estilo LLMCompiler)
+
+No loop padrão do Agno o GPT-4 decide uma rodada de ferramentas, espera os
+resultados e só então decide a próxima. Para perguntas que envolvem vários
+provedores isso significa várias idas e voltas ao modelo.
+
+O PlannerAgent separa planejamento de execução:
+1. Uma chamada ao LLM gera o plano completo como um DAG em JSON
+2. execute_dag executa os nós prontos em paralelo (algoritmo de Kahn),
+   liberando cada nó assim que suas dependências terminam
+3. Uma segunda chamada ao LLM sintetiza a resposta final a partir dos
+   resultados
+
+Se o plano vier inválido, quem chama deve recorrer ao agente Agno.
+"""
+import asyncio
+import inspect
+import json
+from typing import Awaitable, Callable, Optional
+
+from loguru import logger
+from openai import OpenAI
+
+
+# Limite de nós por plano, para conter planos degenerados do LLM
+MAX_PLAN_NODES = 8
+
+_PLANNER_PROMPT = """
+Você planeja chamadas de ferramentas para responder perguntas sobre preços de GPU na nuvem.
+
+FERRAMENTAS DISPONÍVEIS:
+{tools}
+
+Responda APENAS com um objeto JSON no formato:
+{{"plan": [{{"id": 1, "fn": "<ferramenta>", "args": {{...}}, "deps": []}}]}}
+
+REGRAS:
+- Use no máximo {max_nodes} nós
+- "deps" lista os ids dos nós que precisam terminar antes deste
+- Um argumento pode ser "$<id>" para receber o resultado do nó <id> (que deve estar em "deps")
+- Nós sem dependência entre si são executados em paralelo; só crie dependências necessárias
+"""
+
+_SYNTHESIZER_PROMPT = """
+Você é um especialista em preços de nuvem focado em GPUs.
+Com base nos resultados das ferramentas abaixo, responda a pergunta do usuário de forma
+estruturada e clara, compare preços quando possível, sugira a opção mais econômica e
+explique seu raciocínio passo a passo.
+"""
+
+
+async def execute_dag(plan: list[dict], tools: dict[str, Callable[..., Awaitable[str]]]) -> dict[int, str]:
+    """
+    Executa um plano (DAG de chamadas de ferramentas) com máximo paralelismo.
+
+    Usa um contador de dependências pendentes por nó (algoritmo de Kahn):
+    os nós com contador zero começam juntos e, a cada nó concluído
+    (asyncio.wait com FIRST_COMPLETED), os contadores dos dependentes são
+    decrementados e os que chegam a zero são disparados na hora.
+
+    Args:
+        plan: Nós no formato {"id", "fn", "args", "deps"}
+        tools: Ferramentas async disponíveis, por nome
+
+    Returns:
+        dict[int, str]: Resultado de cada nó, por id
+
+    Raises:
+        ValueError: Se o plano referencia ferramentas/nós inexistentes ou tem ciclos
+    """
+    nodes = {node["id"]: node for node in plan}
+    if len(nodes) != len(plan):
+        raise ValueError("Plano com ids duplicados")
+
+    pending = {}
+    dependents: dict[int, list[int]] = {node_id: [] for node_id in nodes}
+    for node_id, node in nodes.items():
+        if node.get("fn") not in tools:
+            raise ValueError(f"Ferramenta desconhecida no plano: {node.get('fn')}")
+        deps = node.get("deps") or []
+        for dep in deps:
+            if dep not in nodes:
+                raise ValueError(f"Dependência inexistente no plano: {dep}")
+            dependents[dep].append(node_id)
+        pending[node_id] = len(deps)
+
+    results: dict[int, str] = {}
+
+    async def run_node(node_id: int) -> None:
+        node = nodes[node_id]
+        args = {
+            # "$<id>" recebe o resultado de uma dependência
+            name: results[int(value[1:])] if isinstance(value, str) and value[1:].isdigit() and value[0] == "$"
+            else value
+            for name, value in (node.get("args") or {}).items()
+        }
+        results[node_id] = await tools[node["fn"]](**args)
+
+    # Cada nó é disparado assim que sua última dependência termina, sem
+    # esperar os demais nós em execução (um nó rápido não fica preso ao
+    # irmão mais lento)
+    running = {asyncio.ensure_future(run_node(node_id)): node_id
+               for node_id, count in pending.items() if count == 0}
+    try:
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                node_id = running.pop(task)
+                # Propaga a falha de uma ferramenta (os demais nós são cancelados)
+                task.result()
+                for dependent in dependents[node_id]:
+                    pending[dependent] -= 1
+                    if pending[dependent] == 0:
+                        running[asyncio.ensure_future(run_node(dependent))] = dependent
+    finally:
+        for task in running:
+            task.cancel()
+
+    if len(results) != len(nodes):
+        raise ValueError("Plano com dependências cíclicas")
+
+    return results
+
+
+class PlannerAgent:
+    """
+    Responde perguntas com um plano de ferramentas gerado em uma única chamada ao LLM.
+
+    Atributos:
+        client: Cliente OpenAI usado no planejamento e na síntese
+        model_id: Modelo de linguagem
+        tools: Ferramentas async disponíveis, por nome
+    """
+
+    def __init__(self, client: OpenAI, model_id: str, tools: dict[str, Callable[..., Awaitable[str]]],
+                 descriptions: dict[str, str]):
+        """
+        Inicializa o planejador.
+
+        Args:
+            client: Cliente OpenAI
+            model_id: Modelo de linguagem (ex: "gpt-4")
+            tools: Ferramentas async disponíveis, por nome
+            descriptions: Descrição de cada ferramenta para o LLM
+        """
+        self.client = client
+        self.model_id = model_id
+        self.tools = tools
+
+        # Assinaturas das ferramentas, montadas uma única vez para o prompt
+        tool_lines = "\n".join(
+            f"- {name}{inspect.signature(fn)}: {descriptions.get(name, '')}"
+            for name, fn in tools.items()
+        )
+        self._planner_prompt = _PLANNER_PROMPT.format(tools=tool_lines, max_nodes=MAX_PLAN_NODES)
+
+    def _complete(self, messages: list[dict], **kwargs) -> str:
+        """Faz uma chamada de chat completion e retorna o texto."""
+        response = self.client.chat.completions.create(model=self.model_id, messages=messages, **kwargs)
+        return response.choices[0].message.content or ""
+
+    async def plan(self, user_query: str) -> list[dict]:
+        """
+        Gera o plano (DAG) de ferramentas para a pergunta.
+
+        Args:
+            user_query: Pergunta do usuário
+
+        Returns:
+            list[dict]: Nós do plano
+
+        Raises:
+            ValueError: Se o LLM não devolver um plano válido
+        """
+        content = await asyncio.to_thread(
+            self._complete,
+            [
+                {"role": "system", "content": self._planner_prompt},
+                {"role": "user", "content": user_query},
+            ],
+            temperature=0,
+        )
+        # O GPT-4 às vezes envolve o JSON em cercas ```json ou acrescenta
+        # texto antes/depois; considera só o trecho do primeiro "{" ao último "}"
+        start, end = content.find("{"), content.rfind("}")
+        try:
+            plan = json.loads(content[start:end + 1] if 0 <= start < end else content)["plan"]
+        except (json.JSONDecodeError, KeyError, TypeError) as e:
+            raise ValueError(f"Plano inválido retornado pelo LLM: {e}") from e
+
+        if not isinstance(plan, list) or not 0 < len(plan) <= MAX_PLAN_NODES:
+            raise ValueError("Plano vazio ou com nós demais")
+        return plan
+
+    async def run(self, user_query: str, max_tokens: Optional[int] = None) -> str:
+        """
+        Planeja, executa e sintetiza a resposta para a pergunta.
+
+        Args:
+            user_query: Pergunta do usuário
+            max_tokens: Limite de tokens da resposta sintetizada (None = sem limite)
+
+        Returns:
+            str: Resposta final
+
+        Raises:
+            ValueError: Se o plano for inválido (quem chama deve recorrer ao agente)
+        """
+        plan = await self.plan(user_query)
+        logger.debug(f"Plano com {len(plan)} nós: {[node.get('fn') for node in plan]}")
+
+        results = await execute_dag(plan, self.tools)
+
+        tool_outputs = "\n\n".join(
+            f"[{node['id']}] {node['fn']}({json.dumps(node.get('args') or {}, ensure_ascii=False)}):\n"
+            f"{results[node['id']]}"
+            for node in plan
+        )
+        return await asyncio.to_thread(
+            self._complete,
+            [
+                {"role": "system", "content": _SYNTHESIZER_PROMPT},
+                {"role": "user", "content": f"Pergunta: {user_query}\n\nResultados:\n{tool_outputs}"},
+            ],
+            **({"max_tokens": max_tokens} if max_tokens is not None else {}),
+        )
@@ -0,0 +1,93 @@
+"""
+Executor de Ferramentas com Concorrência Limitada (ParallelToolExecutor)
+
+Quando o agente dispara várias ferramentas no mesmo turno (ex: comparar
+AWS vs Azure, AWS vs GCP e Azure vs GCP), um asyncio.gather sem limite pode
+estourar limites de taxa dos provedores. Este executor:
+- Limita o número de chamadas simultâneas com um semáforo
+- Refaz chamadas que falham com erros transitórios (HTTP 429/5xx)
+  usando backoff exponencial com jitter
+"""
+import asyncio
+import random
+from typing import Any, Awaitable, Callable, Optional
+
+from loguru import logger
+
+
+# Códigos HTTP que indicam falha transitória (limite de taxa ou servidor)
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    """Extrai o código HTTP de exceções de SDKs (openai, httpx, requests)."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+class ParallelToolExecutor:
+    """
+    Executa corrotinas de ferramentas com concorrência limitada e retentativas.
+
+    Atributos:
+        max_concurrency: Número máximo de chamadas simultâneas
+        max_retries: Retentativas para erros transitórios
+        base_delay: Espera inicial (segundos) do backoff exponencial
+    """
+
+    __slots__ = ("max_concurrency", "max_retries", "base_delay", "_semaphore", "_loop")
+
+    def __init__(self, max_concurrency: int = 8, max_retries: int = 3, base_delay: float = 0.5):
+        """
+        Inicializa o executor.
+
+        Args:
+            max_concurrency: Número máximo de chamadas simultâneas
+            max_retries: Retentativas para erros transitórios
+            base_delay: Espera inicial (segundos) do backoff exponencial
+        """
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+
+        # O semáforo é criado por event loop: analyze_query usa asyncio.run,
+        # que cria um loop novo a cada chamada
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Retorna o semáforo do event loop atual."""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    async def run(self, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        Executa `fn(*args, **kwargs)` respeitando o limite de concorrência.
+
+        Erros com código HTTP transitório são refeitos até `max_retries`
+        vezes; qualquer outro erro é propagado imediatamente.
+
+        Returns:
+            Any: Resultado da corrotina
+        """
+        async with self._get_semaphore():
+            for attempt in range(self.max_retries + 1):
+                try:
+                    return await fn(*args, **kwargs)
+                except Exception as e:
+                    status = _status_code(e)
+                    if attempt >= self.max_retries or status not in RETRYABLE_STATUS_CODES:
+                        raise
+
+                    # Backoff exponencial com jitter para não sincronizar retentativas
+                    delay = self.base_delay * (2 ** attempt) * (1 + random.random())
+                    logger.warning(
+                        f"Erro transitório ({status}) em {getattr(fn, '__name__', fn)}, "
+                        f"nova tentativa em {delay:.2f}s"
+                    )
+                    await asyncio.sleep(delay)
@@ -5,25 +5,49 @@ API FastAPI para o Agente IA de Precificação em Nuvem.
 Esta API fornece endpoints HTTP para interagir com o agente de IA,
 permitindo fazer perguntas sobre preços de GPU via interface web.
 """
+import asyncio
 import os
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.exception_handlers import request_validation_exception_handler
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, field_validator
+from pydantic_core import PydanticCustomError
 from loguru import logger
+import orjson
 
 # Importar o agente principal
 from agents import CloudPricingAgent
 from utils import setup_logging, Config
 
+# Tipo do erro de validação de uma pergunta vazia (respondido com 400)
+EMPTY_QUESTION_ERROR = "pergunta_vazia"
+
 # Modelo para requisições
 class QueryRequest(BaseModel):
     question: str
 
+    @field_validator("question")
+    @classmethod
+    def _normalizar_pergunta(cls, value: str) -> str:
+        """Remove espaços das pontas e rejeita perguntas vazias (HTTP 400, ver handler abaixo)."""
+        value = value.strip()
+        if not value:
+            raise PydanticCustomError(EMPTY_QUESTION_ERROR, "Pergunta não pode estar vazia")
+        return value
+
 # Configurar FastAPI
 app = FastAPI(
     title="Agente IA de Precificação em Nuvem",
     description="API para consultar preços de GPU nos provedores de nuvem AWS, Azure e GCP",
-    version="1.0.0"
+    version="1.0.0",
+    # Respostas JSON serializadas com orjson (extensão em C, mais rápida)
+    default_response_class=ORJSONResponse
 )
 
 # Configurar CORS para permitir acesso do frontend
@@ -35,13 +59,67 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Instância global do agente (inicializada na startup)
-agent = None
+# Rotas cujas respostas nunca passam pelo GZip
+UNCOMPRESSED_PATHS = frozenset({"/ask/stream"})
+
+
+class _StreamSafeGZipMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware que deixa as rotas de streaming sem compressão.
+
+    Versões do Starlette anteriores à 0.46 compactam text/event-stream e
+    acumulam os eventos no buffer do gzip, então o cliente só recebe a
+    resposta do SSE no final. Excluir a rota explicitamente mantém o
+    streaming incremental independente da versão instalada.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "http" and scope["path"] in UNCOMPRESSED_PATHS:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+# Compacta respostas maiores (respostas longas do agente, resultados de
+# batch); o streaming (/ask/stream) fica de fora da compressão
+app.add_middleware(_StreamSafeGZipMiddleware, minimum_size=500)
+
+# Pool de agentes pré-inicializados (criado na startup)
+# Cada requisição usa um agente exclusivo, então execuções concorrentes do
+# GPT-4 não compartilham estado do Agno (histórico, cliente). As ferramentas
+# (busca, base vetorial, modelo de embedding) são únicas no processo e
+# compartilhadas por todos os agentes do pool
+agent_pool: Optional[asyncio.Queue] = None
+
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    """
+    Mantém o contrato da API para perguntas vazias: HTTP 400 com "detail" em texto.
+
+    A validação de QueryRequest rejeita a pergunta antes do handler; sem este
+    tratamento o FastAPI responderia 422. Outros erros de validação (ex:
+    campo "question" ausente) seguem com a resposta 422 padrão.
+    """
+    errors = exc.errors()
+    if errors and all(error["type"] == EMPTY_QUESTION_ERROR for error in errors):
+        detail = ("Perguntas não podem estar vazias" if request.url.path == "/ask/batch"
+                  else "Pergunta não pode estar vazia")
+        return ORJSONResponse(status_code=400, content={"detail": detail})
+    return await request_validation_exception_handler(request, exc)
+
+@asynccontextmanager
+async def acquire_agent() -> AsyncIterator[CloudPricingAgent]:
+    """Empresta um agente do pool, devolvendo-o ao final do uso."""
+    agent = await agent_pool.get()
+    try:
+        yield agent
+    finally:
+        agent_pool.put_nowait(agent)
 
 @app.on_event("startup")
 async def startup_event():
-    """Inicializa o agente quando a API inicia."""
-    global agent
+    """Inicializa o pool de agentes quando a API inicia."""
+    global agent_pool
 
     # Validar configuração
     if not Config.validar():
@@ -51,10 +129,13 @@ async def startup_event():
     # Configurar logging
     setup_logging()
 
-    # Inicializar agente
+    # Inicializar agentes
     try:
-        agent = CloudPricingAgent()
-        logger.info("Agente IA inicializado com sucesso na API")
+        pool = asyncio.Queue()
+        for _ in range(Config.AGENT_POOL_SIZE):
+            pool.put_nowait(CloudPricingAgent())
+        agent_pool = pool
+        logger.info(f"Pool com {Config.AGENT_POOL_SIZE} agentes IA inicializado com sucesso na API")
     except Exception as e:
         logger.error(f"Erro ao inicializar agente: {e}")
         raise RuntimeError(f"Falha na inicialização do agente: {e}")
@@ -68,6 +149,9 @@ async def root():
         "endpoints": {
             "GET /": "Esta documentação",
             "POST /ask": "Fazer pergunta ao agente",
+            "POST /ask/stream": "Fazer pergunta ao agente com resposta em streaming (SSE)",
+            "POST /ask/batch": "Enviar várias perguntas via Batch API (custo reduzido, até 24h)",
+            "GET /ask/batch/{batch_id}": "Consultar status e respostas de um batch",
             "GET /health": "Verificar saúde da API"
         },
         "exemplos": [
@@ -82,7 +166,7 @@ async def health_check():
     """Verifica se a API está funcionando."""
     return {
         "status": "healthy",
-        "agent_ready": agent is not None,
+        "agent_ready": agent_pool is not None,
         "timestamp": "2025-01-20T13:15:00Z"  # Em produção, use datetime.utcnow()
     }
 
@@ -97,17 +181,17 @@ async def ask_agent(request: QueryRequest):
     Returns:
         dict: Resposta estruturada do agente
     """
-    if not agent:
+    if agent_pool is None:
         raise HTTPException(status_code=503, detail="Agente não inicializado")
 
-    if not request.question or not request.question.strip():
-        raise HTTPException(status_code=400, detail="Pergunta não pode estar vazia")
-
     try:
         logger.info(f"Pergunta recebida via API: '{request.question}'")
 
         # Processar pergunta com o agente
-        resposta = agent.analyze_query(request.question.strip())
+        # A versão async não bloqueia o event loop: outras requisições
+        # continuam sendo atendidas enquanto o GPT-4 responde
+        async with acquire_agent() as agent:
+            resposta = await agent.aanalyze_query(request.question)
 
         logger.info("Pergunta processada com sucesso via API")
 
@@ -122,6 +206,127 @@ async def ask_agent(request: QueryRequest):
         logger.error(f"Erro ao processar pergunta via API: {e}")
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
+@app.post("/ask/stream")
+async def ask_agent_stream(request: QueryRequest):
+    """
+    Faz uma pergunta ao agente e transmite a resposta via Server-Sent Events.
+
+    Cada evento traz um trecho da resposta ({"delta": "..."}) assim que o
+    modelo o gera; o último evento é {"done": true}.
+
+    Args:
+        request: Objeto contendo a pergunta do usuário
+
+    Returns:
+        StreamingResponse: Fluxo text/event-stream com a resposta
+    """
+    if agent_pool is None:
+        raise HTTPException(status_code=503, detail="Agente não inicializado")
+
+    logger.info(f"Pergunta recebida via API (streaming): '{request.question}'")
+
+    async def event_gen():
+        try:
+            # O agente fica reservado até o fim da transmissão
+            async with acquire_agent() as agent:
+                async for delta in agent.astream_query(request.question):
+                    yield b"data: " + orjson.dumps({"delta": delta}) + b"\n\n"
+            yield b"data: " + orjson.dumps({"done": True}) + b"\n\n"
+        except Exception as e:
+            # O status HTTP já foi enviado: o erro segue como evento
+            logger.error(f"Erro ao transmitir resposta via API: {e}")
+            yield b"data: " + orjson.dumps({"error": str(e)}) + b"\n\n"
+
+    return StreamingResponse(event_gen(), media_type="text/event-stream")
+
+@app.post("/ask/batch")
+async def ask_agent_batch(requests: List[QueryRequest]):
+    """
+    Envia várias perguntas ao agente via Batch API da OpenAI.
+
+    Indicado para avaliações em lote e análises offline: metade do custo,
+    com respostas disponíveis em até 24h via GET /ask/batch/{batch_id}.
+
+    Args:
+        requests: Lista de objetos contendo as perguntas
+
+    Returns:
+        dict: ID e status do batch criado
+    """
+    if agent_pool is None:
+        raise HTTPException(status_code=503, detail="Agente não inicializado")
+
+    # Cada pergunta já chega validada (sem espaços nas pontas, não vazia)
+    questions = [request.question for request in requests]
+    if not questions:
+        raise HTTPException(status_code=400, detail="Perguntas não podem estar vazias")
+
+    try:
+        # Upload e criação do batch são chamadas bloqueantes ao SDK da OpenAI
+        async with acquire_agent() as agent:
+            batch_id = await asyncio.to_thread(agent.submit_batch, questions)
+        return {"success": True, "batch_id": batch_id, "total": len(questions)}
+
+    except Exception as e:
+        logger.error(f"Erro ao enviar batch via API: {e}")
+        raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
+
+@app.get("/ask/batch/{batch_id}")
+async def get_agent_batch(batch_id: str):
+    """
+    Consulta um batch enviado por POST /ask/batch.
+
+    Args:
+        batch_id: ID do batch
+
+    Returns:
+        dict: Status do batch e, quando concluído, as respostas
+    """
+    if agent_pool is None:
+        raise HTTPException(status_code=503, detail="Agente não inicializado")
+
+    try:
+        async with acquire_agent() as agent:
+            return await asyncio.to_thread(agent.get_batch, batch_id)
+
+    except Exception as e:
+        logger.error(f"Erro ao consultar batch {batch_id}: {e}")
+        raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+
+    # uvloop (event loop em C) e httptools (parser HTTP em C) aumentam a
+    # vazão do servidor; sem os extras do uvicorn, usa asyncio e h11
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        loop = "asyncio"
+    try:
+        import httptools  # noqa: F401
+        http = "httptools"
+    except ImportError:
+        http = "h11"
+
+    # Um único processo: cada worker abriria seu próprio PersistentClient
+    # no mesmo diretório do ChromaDB (que não é seguro entre processos) e
+    # carregaria mais uma cópia do modelo de embedding. A concorrência vem
+    # do pool de agentes (AGENT_POOL_SIZE) dentro deste processo
+    if Config.API_WORKERS > 1:
+        raise SystemExit(
+            f"API_WORKERS={Config.API_WORKERS} não é suportado: o ChromaDB local em "
+            f"{Config.CHROMA_DB_PATH} não pode ser compartilhado por vários processos. "
+            "Use API_WORKERS=1 e ajuste AGENT_POOL_SIZE."
+        )
+
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8000,
+        loop=loop,
+        http=http,
+        # Log de acesso por requisição apenas em modo verboso (desenvolvimento)
+        log_level="info" if Config.VERBOSE_LOGS else "warning",
+        access_log=Config.VERBOSE_LOGS
+    )
@@ -8,58 +8,145 @@ Este arquivo é o ponto de entrada CLI da aplicação. Ele:
 - Processa queries do usuário via linha de comando
 - Exibe respostas estruturadas
 """
+import asyncio
 import sys
 import os
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
+
+import requests
 
 # Adiciona o diretório src ao path para permitir imports relativos
 sys.path.insert(0, os.path.dirname(__file__))
 
 # Importa módulos utilitários para configuração e logging
 from utils import setup_logging, Config
-# Importa o agente principal que coordena todas as operações
-from agents import CloudPricingAgent
+# O agente principal (Agno, ChromaDB, OpenAI) é importado apenas quando a
+# query é processada neste processo: mensagens de uso e respostas vindas
+# da API local não pagam esse custo de inicialização
+if TYPE_CHECKING:
+    from agents import CloudPricingAgent
 # Logger para registrar operações e debug
 from loguru import logger
 
+# Executor da query async: uvloop.run roda as chamadas ao GPT-4 e as
+# ferramentas async no event loop em C, sem alterar a política global de
+# event loop (uvloop.install está obsoleto). Sem o pacote (ou em versões
+# anteriores à 0.18, sem uvloop.run), segue com o asyncio padrão
+try:
+    import uvloop
+    _run_async = getattr(uvloop, "run", asyncio.run)
+except ImportError:
+    _run_async = asyncio.run
+
+
+@lru_cache(maxsize=4)
+def _get_agent(use_cache: bool = True) -> "CloudPricingAgent":
+    """
+    Retorna o agente do processo para a configuração pedida.
+
+    Criar um CloudPricingAgent abre o ChromaDB, carrega o modelo de
+    embedding e registra as ferramentas. Scripts que chamam main() várias
+    vezes no mesmo processo reaproveitam a instância já criada. A CLI é
+    single-thread, então não há uso concorrente do agente.
+    """
+    from agents import CloudPricingAgent
+
+    return CloudPricingAgent(use_cache=use_cache)
+
+
+async def _analyze(agent: "CloudPricingAgent", query: str) -> str:
+    """Processa a query e fecha o cliente OpenAI async do loop de uso único."""
+    from agents import aclose_async_openai_client
+
+    try:
+        return await agent.aanalyze_query(query)
+    finally:
+        await aclose_async_openai_client()
+
+
+def ask_running_api(query: str) -> Optional[str]:
+    """
+    Envia a query para a API local, se houver uma em execução.
+
+    A API mantém agentes já inicializados (ChromaDB, modelo de embedding,
+    ferramentas), então a CLI evita pagar essa inicialização a cada
+    execução e responde em uma ida e volta HTTP.
+
+    Args:
+        query: Pergunta do usuário
+
+    Returns:
+        str | None: Resposta do agente, ou None se a API não estiver disponível
+    """
+    try:
+        response = requests.post(
+            f"{Config.AGENT_API_URL}/ask",
+            json={"question": query},
+            timeout=(0.5, 300)  # conexão rápida; a resposta pode demorar
+        )
+        response.raise_for_status()
+        return response.json()["answer"]
+    except requests.ConnectionError:
+        # Nenhuma API em execução: caso normal, sem aviso
+        return None
+    except (requests.RequestException, ValueError, KeyError) as e:
+        # Timeout, status de erro ou corpo que não é a resposta esperada
+        # (JSON inválido ou sem "answer"): a query é processada localmente
+        logger.warning(f"API local indisponível ({e}), processando localmente")
+        return None
+
 
 def main():
     """
     Função principal da aplicação.
 
     Fluxo de execução:
-    1. Valida configuração (API keys, etc.)
+    1. Lê a query dos argumentos
     2. Configura sistema de logging
-    3. Inicializa agente IA
-    4. Processa query do usuário
+    3. Envia a query para a API local, se estiver em execução
+    4. Caso contrário, valida configuração, inicializa o agente IA e
+       processa a query neste processo
     5. Exibe resposta formatada
     """
-    # Validação inicial da configuração
-    # Verifica se OPENAI_API_KEY está configurada no .env
-    if not Config.validar():
-        print("ERRO: Configuração inválida. Verifique seu arquivo .env")
-        sys.exit(1)
-
-    # Inicializa sistema de logging com rotação automática
-    setup_logging()
-
-    # Cria instância do agente IA com suas 3 ferramentas
-    agent = CloudPricingAgent()
-
     # Processamento de argumentos da linha de comando
+    # --no-cache força a passagem pelo LLM (ignora respostas em cache)
+    args = sys.argv[1:]
+    use_cache = "--no-cache" not in args
+    args = [arg for arg in args if arg != "--no-cache"]
+
     # Espera pelo menos uma query como argumento
-    if len(sys.argv) < 2:
-        print("Uso: python src/main.py 'sua pergunta sobre preços de GPU'")
+    if not args:
+        print("Uso: python src/main.py [--no-cache] 'sua pergunta sobre preços de GPU'")
         print("Exemplo: python src/main.py 'Quanto custa uma GPU V100 na AWS?'")
         sys.exit(1)
 
     # Junta todos os argumentos em uma única string de query
-    query = " ".join(sys.argv[1:])
+    query = " ".join(args)
+
+    # Inicializa sistema de logging com rotação automática
+    setup_logging()
     logger.info(f"Processando query do usuário: {query}")
 
     try:
-        # Executa a query através do agente IA
-        # O agente decide automaticamente quais ferramentas usar
-        resposta = agent.analyze_query(query)
+        # Com uma API local em execução, reaproveita seus agentes já
+        # inicializados (a API usa cache, então --no-cache processa aqui)
+        resposta = ask_running_api(query) if use_cache else None
+
+        if resposta is None:
+            # Validação da configuração (OPENAI_API_KEY no .env), necessária
+            # apenas para processar a query neste processo
+            if not Config.validar():
+                print("ERRO: Configuração inválida. Verifique seu arquivo .env")
+                sys.exit(1)
+
+            # Obtém o agente IA com suas 3 ferramentas (criado uma vez por processo)
+            agent = _get_agent(use_cache)
+
+            # Executa a query através do agente IA (versão async, no event
+            # loop escolhido acima). O agente decide automaticamente quais
+            # ferramentas usar
+            resposta = _run_async(_analyze(agent, query))
 
         # Formatação e exibição da resposta
         # Usa separadores visuais para destacar a resposta
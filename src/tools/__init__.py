@@ -10,6 +10,5 @@ from .external_api import ExternalAPITool
 __all__ = [
     "MockSearchTool",
     "VectorStoreTool",
-    "ExternalAPITool",
-    "MockExternalAPIServer"
+    "ExternalAPITool"
 ]
@@ -10,10 +10,82 @@ Responsabilidades:
 - Calcular economias potenciais entre provedores
 - Retornar análises de mercado
 """
-import json
+import functools
+import sys
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import orjson
 from loguru import logger
 
 
+# Cache dos resultados por instância: os dados de mercado mudam pouco e o
+# agente repete as mesmas perguntas dentro de um raciocínio
+API_CACHE_MAXSIZE = 256
+API_CACHE_TTL = 300  # segundos
+
+# Base de dados simulada de comparações
+# Em produção, isso viria de uma API real de análise de mercado
+_COMPARISON_TABLE = {
+    ("AWS", "Azure"): {
+        "V100": {"aws_price": 3.06, "azure_price": 2.80, "recommendation": "Azure", "savings": "8.5%"},
+        "K80": {"aws_price": 0.90, "azure_price": 0.85, "recommendation": "Azure", "savings": "5.6%"}
+    },
+    ("AWS", "GCP"): {
+        "V100": {"aws_price": 3.06, "gcp_price": 2.90, "recommendation": "GCP", "savings": "5.2%"},
+        "K80": {"aws_price": 0.90, "gcp_price": 0.70, "recommendation": "GCP", "savings": "22.2%"}
+    },
+    ("Azure", "GCP"): {
+        "K80": {"azure_price": 0.85, "gcp_price": 0.70, "recommendation": "GCP", "savings": "17.6%"}
+    }
+}
+
+@functools.lru_cache(maxsize=256)
+def _canon(value: str) -> str:
+    """
+    Canoniza provedor/GPU ("aws ", "Aws" -> "AWS").
+
+    A entrada do LLM se repete muito ("AWS", "Azure", "GCP"), então o cache
+    transforma a normalização em uma consulta de dicionário; sys.intern
+    faz os valores coincidirem com as chaves do índice por identidade.
+    """
+    return sys.intern(value.strip().upper())
+
+
+# Índice plano montado uma única vez: (par de provedores sem ordem, GPU) ->
+# preços por provedor. Uma única consulta atende AWS vs Azure e Azure vs AWS
+_COMPARISONS: dict[tuple[frozenset, str], dict] = {
+    (frozenset({_canon(provider1), _canon(provider2)}), _canon(gpu_type)): {
+        "precos": {
+            _canon(provider1): data[f"{provider1.lower()}_price"],
+            _canon(provider2): data[f"{provider2.lower()}_price"]
+        },
+        "recomendacao": data["recommendation"],
+        "economia": data["savings"]
+    }
+    for (provider1, provider2), gpus in _COMPARISON_TABLE.items()
+    for gpu_type, data in gpus.items()
+}
+
+# Dados simulados de tendências de mercado
+# Em produção, isso viria de análise real de dados históricos
+_MARKET_TRENDS = {
+    "AWS": {
+        "tendencia": "estavel",
+        "analise": "Demanda alta mantém preços estáveis, boa disponibilidade"
+    },
+    "Azure": {
+        "tendencia": "crescendo",
+        "analise": "Aumento na demanda por workloads de IA, preços em ascensão"
+    },
+    "GCP": {
+        "tendencia": "estavel",
+        "analise": "Preços competitivos, foco em workloads sustentáveis"
+    }
+}
+
+
 class ExternalAPITool:
     """
     Ferramenta que simula uma API externa de análise de mercado.
@@ -29,6 +101,7 @@ class ExternalAPITool:
     Atributos:
         base_url: URL base da API simulada
         api_key: Chave de autenticação simulada
+        _cache: Resultados recentes (LRU com expiração), por método e argumentos
     """
 
     def __init__(self, base_url: str = "http://localhost:8001", api_key: str = "demo"):
@@ -41,6 +114,27 @@ class ExternalAPITool:
         """
         self.base_url = base_url
         self.api_key = api_key
+        self._cache: "OrderedDict[tuple, tuple[float, str]]" = OrderedDict()
+
+    def _get_cached(self, key: tuple) -> Optional[str]:
+        """Retorna o resultado em cache, ou None se ausente/expirado."""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        created_at, result = entry
+        if time.monotonic() - created_at > API_CACHE_TTL:
+            del self._cache[key]
+            return None
+        # Marca como usado recentemente (política LRU)
+        self._cache.move_to_end(key)
+        return result
+
+    def _store_cached(self, key: tuple, result: str) -> None:
+        """Armazena um resultado, descartando o menos usado se o cache encher."""
+        self._cache[key] = (time.monotonic(), result)
+        self._cache.move_to_end(key)
+        while len(self._cache) > API_CACHE_MAXSIZE:
+            self._cache.popitem(last=False)
 
     def compare_prices(self, provider1: str, provider2: str, gpu_type: str = "") -> str:
         """
@@ -63,63 +157,45 @@ class ExternalAPITool:
         Returns:
             str: JSON com resultados da comparação ou mensagem de erro
         """
-        logger.info(f"Iniciando comparação: {provider1} vs {provider2} para GPU {gpu_type}")
-
-        # Base de dados simulada de comparações
-        # Em produção, isso viria de uma API real de análise de mercado
-        comparisons = {
-            ("AWS", "Azure"): {
-                "V100": {"aws_price": 3.06, "azure_price": 2.80, "recommendation": "Azure", "savings": "8.5%"},
-                "K80": {"aws_price": 0.90, "azure_price": 0.85, "recommendation": "Azure", "savings": "5.6%"}
-            },
-            ("AWS", "GCP"): {
-                "V100": {"aws_price": 3.06, "gcp_price": 2.90, "recommendation": "GCP", "savings": "5.2%"},
-                "K80": {"aws_price": 0.90, "gcp_price": 0.70, "recommendation": "GCP", "savings": "22.2%"}
-            },
-            ("Azure", "GCP"): {
-                "K80": {"azure_price": 0.85, "gcp_price": 0.70, "recommendation": "GCP", "savings": "17.6%"}
-            }
-        }
+        logger.debug(f"Iniciando comparação: {provider1} vs {provider2} para GPU {gpu_type}")
 
-        # Tenta encontrar comparação direta
-        key = (provider1, provider2)
-        reverse_key = (provider2, provider1)
+        cache_key = ("compare_prices", provider1, provider2, gpu_type)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
 
-        if key in comparisons and gpu_type in comparisons[key]:
-            # Comparação direta encontrada
-            data = comparisons[key][gpu_type]
-            result = {
-                "comparacao": {
-                    f"{provider1}_preco": data[f"{provider1.lower()}_price"],
-                    f"{provider2}_preco": data[f"{provider2.lower()}_price"],
-                    "recomendacao": data["recommendation"],
-                    "economia": data["savings"]
-                }
-            }
-            logger.info(f"Comparação encontrada: {data['recommendation']} recomendado com {data['savings']} de economia")
+        # Canoniza a entrada uma única vez ("aws ", "Aws" e "AWS" são iguais)
+        # e faz uma consulta única no índice, independente da ordem
+        canonical1, canonical2 = _canon(provider1), _canon(provider2)
+        data = _COMPARISONS.get((frozenset({canonical1, canonical2}), _canon(gpu_type)))
 
-        elif reverse_key in comparisons and gpu_type in comparisons[reverse_key]:
-            # Comparação reversa encontrada (ex: Azure vs AWS quando pediu AWS vs Azure)
-            data = comparisons[reverse_key][gpu_type]
+        if data is not None:
+            prices = data["precos"]
             result = {
                 "comparacao": {
-                    f"{provider1}_preco": data[f"{provider2.lower()}_price"],  # Inverte os preços
-                    f"{provider2}_preco": data[f"{provider1.lower()}_price"],  # Inverte os preços
-                    "recomendacao": data["recommendation"],
-                    "economia": data["savings"]
+                    f"{provider1.strip()}_preco": prices[canonical1],
+                    f"{provider2.strip()}_preco": prices[canonical2],
+                    "recomendacao": data["recomendacao"],
+                    "economia": data["economia"]
                 }
             }
-            logger.info(f"Comparação reversa encontrada: {data['recommendation']} recomendado")
+            logger.debug(f"Comparação encontrada: {data['recomendacao']} recomendado com {data['economia']} de economia")
 
         else:
             # Nenhuma comparação disponível
-            logger.info(f"Comparação não disponível: {provider1} vs {provider2} para {gpu_type}")
+            logger.debug(f"Comparação não disponível: {provider1} vs {provider2} para {gpu_type}")
             result = {
                 "mensagem": f"Comparação não disponível para {provider1} vs {provider2} com GPU {gpu_type}"
             }
 
-        # Retorna resultado em JSON para o agente
-        return json.dumps(result, ensure_ascii=False, indent=2)
+        # Retorna resultado em JSON compacto para o agente (o LLM não precisa
+        # de indentação, que só aumenta o tamanho e os tokens)
+        # Só resultados com dados entram no cache; uma indisponibilidade
+        # não deve ficar presa por todo o TTL
+        output = orjson.dumps(result).decode()
+        if "mensagem" not in result:
+            self._store_cached(cache_key, output)
+        return output
 
     def get_market_trends(self, provider: str = "all") -> str:
         """
@@ -134,39 +210,35 @@ class ExternalAPITool:
         Returns:
             str: JSON com tendências de mercado
         """
-        logger.info(f"Consultando tendências de mercado para: {provider}")
-
-        # Dados simulados de tendências de mercado
-        # Em produção, isso viria de análise real de dados históricos
-        trends = {
-            "AWS": {
-                "tendencia": "estavel",
-                "analise": "Demanda alta mantém preços estáveis, boa disponibilidade"
-            },
-            "Azure": {
-                "tendencia": "crescendo",
-                "analise": "Aumento na demanda por workloads de IA, preços em ascensão"
-            },
-            "GCP": {
-                "tendencia": "estavel",
-                "analise": "Preços competitivos, foco em workloads sustentáveis"
-            }
-        }
+        logger.debug(f"Consultando tendências de mercado para: {provider}")
+
+        cache_key = ("get_market_trends", provider)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
+
+        trends = _MARKET_TRENDS
 
         if provider == "all":
             # Retorna tendências para todos os provedores
             result = {"tendencias": trends}
-            logger.info("Tendências de todos os provedores retornadas")
+            logger.debug("Tendências de todos os provedores retornadas")
         elif provider in trends:
             # Retorna tendência de um provedor específico
             result = {provider: trends[provider]}
-            logger.info(f"Tendência de {provider} retornada")
+            logger.debug(f"Tendência de {provider} retornada")
         else:
             # Provedor não encontrado
             result = {
                 "mensagem": f"Tendências não disponíveis para o provedor: {provider}"
             }
-            logger.info(f"Tendência não encontrada para: {provider}")
-
-        # Retorna resultado em JSON para o agente
-        return json.dumps(result, ensure_ascii=False, indent=2)
\ No newline at end of file
+            logger.debug(f"Tendência não encontrada para: {provider}")
+
+        # Retorna resultado em JSON compacto para o agente (o LLM não precisa
+        # de indentação, que só aumenta o tamanho e os tokens)
+        # Só resultados com dados entram no cache; uma indisponibilidade
+        # não deve ficar presa por todo o TTL
+        output = orjson.dumps(result).decode()
+        if "mensagem" not in result:
+            self._store_cached(cache_key, output)
+        return output
\ No newline at end of file
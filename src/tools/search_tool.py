@@ -7,12 +7,43 @@ Ela representa a primeira ferramenta do agente: uma "busca local" em dados JSON.
 Responsabilidades:
 - Carregar dados mock de preços de GPU de provedores de nuvem
 - Realizar buscas textuais simples nos dados
+- Filtrar instâncias por tipo de GPU, quantidade de GPUs e preço
 - Retornar resultados formatados em JSON
 """
-import json
+import functools
+import os
+import pickle
+import re
+import tempfile
+from collections import defaultdict
+from dataclasses import dataclass
+from itertools import islice
+
+import numpy as np
+import orjson
 from loguru import logger
 
 
+# Limite de resultados por busca, para não sobrecarregar o LLM
+MAX_RESULTS = 5
+
+# Versão do formato do índice salvo em disco; incrementar ao mudar os campos
+INDEX_CACHE_VERSION = 1
+
+
+@dataclass(frozen=True, slots=True)
+class PricingResult:
+    """
+    Instância indexada, no formato devolvido ao agente.
+
+    Registro de layout fixo (sem dict por objeto), criado uma única vez na
+    montagem do índice e reutilizado em todas as buscas. O orjson serializa
+    dataclasses nativamente como objetos JSON.
+    """
+    provider: str   # AWS, Azure, GCP
+    category: str   # gpus, etc.
+    data: dict      # Dados completos da instância
+
 class MockSearchTool:
     """
     Ferramenta de busca simulada que representa uma "API de busca local".
@@ -23,8 +54,17 @@ class MockSearchTool:
     Atributos:
         data_file: Caminho para o arquivo JSON com dados mock
         data: Dados carregados em memória
+        _items: Instâncias indexadas, como PricingResult
+        _postings: Índice invertido: termo em minúsculas -> conjunto de ids em _items
+        _blobs: Texto em minúsculas de cada instância, para buscas por trecho
+        _gpu_types, _gpu_counts, _prices: Colunas numpy paralelas
+            a _items (layout SoA), usadas nos filtros vetorizados
+        index_file: Índice salvo em disco, reaproveitado entre execuções
     """
 
+    # Atributos salvos no arquivo de índice
+    _INDEX_FIELDS = ("data", "_items", "_postings", "_blobs", "_gpu_types", "_gpu_counts", "_prices")
+
     def __init__(self, data_file: str = "data/pricing_data.json"):
         """
         Inicializa a ferramenta de busca.
@@ -33,8 +73,25 @@ class MockSearchTool:
             data_file: Caminho para arquivo JSON com dados de preços
         """
         self.data_file = data_file
-        # Carrega dados uma vez na inicialização para performance
-        self.data = self._load_data()
+        self.index_file = os.path.splitext(data_file)[0] + ".idx.pkl"
+
+        # Índice invertido montado uma única vez: a busca vira consultas a
+        # dicionário em vez de varrer (e serializar) todos os itens
+        self._items: list[PricingResult] = []
+        self._postings: dict[str, frozenset[int]] = {}
+        self._blobs: list[str] = []
+
+        # Reaproveita o índice salvo por uma execução anterior enquanto o
+        # arquivo de dados não mudar; senão carrega os dados e reconstrói
+        if not self._load_index():
+            # Carrega dados uma vez na inicialização para performance
+            self.data = self._load_data()
+            self._build_index()
+            self._save_index()
+
+        # Cache de resultados por query normalizada: os dados não mudam após
+        # a carga, então buscas repetidas do agente voltam direto do cache
+        self._search_cached = functools.lru_cache(maxsize=512)(self._search)
 
     def _load_data(self):
         """
@@ -47,15 +104,128 @@ class MockSearchTool:
             dict: Dados carregados ou dict vazio se arquivo não existir
         """
         try:
-            # Abre arquivo com encoding UTF-8 para suportar caracteres especiais
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            # Lê os bytes do arquivo e decodifica com orjson (UTF-8 nativo)
+            with open(self.data_file, 'rb') as f:
+                return orjson.loads(f.read())
         except FileNotFoundError:
             # Log de warning se arquivo não existir (desenvolvimento)
             logger.warning(f"Arquivo {self.data_file} não encontrado, usando dados vazios")
             return {}
 
-    def search_gpu_pricing(self, query: str) -> str:
+    def _build_index(self):
+        """
+        Percorre os dados uma vez e indexa cada instância pelos seus termos.
+
+        Estrutura dos dados: cloud_providers -> provedor -> categoria ->
+        {chave da instância: dados}. Cada instância é indexada pelo nome do
+        provedor, da categoria, pela chave da instância e por cada valor de
+        campo, tanto o valor completo (ex: "a2 highgpu 1g") quanto cada
+        palavra dele (ex: "v100").
+        """
+        postings: defaultdict[str, set[int]] = defaultdict(set)
+        for provider, categories in self.data.get("cloud_providers", {}).items():
+            for category, items in categories.items():
+                for key, item in items.items():
+                    item_id = len(self._items)
+                    self._items.append(PricingResult(provider, category, item))
+
+                    values = [provider, category, key, *(str(value) for value in item.values())]
+                    terms = set()
+                    for value in values:
+                        value_lower = value.lower()
+                        terms.add(value_lower)
+                        terms.update(value_lower.split())
+
+                    for term in terms:
+                        postings[term].add(item_id)
+
+                    # Texto completo serializado uma única vez, para buscas
+                    # por trecho de palavra (ex: "p3", "standard")
+                    self._blobs.append(f"{provider} {category} {key} {orjson.dumps(item).decode()}".lower())
+
+        # Conjuntos imutáveis: a interseção na busca não copia as listas
+        self._postings = {term: frozenset(ids) for term, ids in postings.items()}
+
+        # Colunas paralelas a _items (um array por campo, em vez de um dict
+        # por instância): os filtros viram comparações vetorizadas do numpy
+        self._gpu_types = np.array([str(r.data.get("gpu_type", "")).upper() for r in self._items], dtype=str)
+        self._gpu_counts = np.array([r.data.get("gpu_count", 0) for r in self._items], dtype=np.int64)
+        self._prices = np.array([r.data.get("price_per_hour", 0.0) for r in self._items], dtype=np.float64)
+
+        logger.debug(f"Índice de busca com {len(self._items)} instâncias e {len(self._postings)} termos")
+
+    def _data_signature(self):
+        """
+        Identifica a versão do arquivo de dados (mtime e tamanho).
+
+        Returns:
+            tuple | None: Assinatura usada no cabeçalho do índice, ou None se
+                o arquivo de dados não existir
+        """
+        try:
+            stat = os.stat(self.data_file)
+        except OSError:
+            return None
+        return (INDEX_CACHE_VERSION, stat.st_mtime_ns, stat.st_size)
+
+    def _load_index(self) -> bool:
+        """
+        Carrega o índice salvo em disco, se corresponder ao arquivo de dados atual.
+
+        Returns:
+            bool: True se o índice foi carregado; False se precisa ser reconstruído
+        """
+        signature = self._data_signature()
+        if signature is None:
+            return False
+
+        try:
+            with open(self.index_file, "rb") as f:
+                header, state = pickle.load(f)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            # Arquivo corrompido ou de outra versão do código: reconstrói
+            logger.warning(f"Índice de busca em {self.index_file} ignorado: {e}")
+            return False
+
+        if header != signature:
+            return False
+
+        for field, value in zip(self._INDEX_FIELDS, state):
+            setattr(self, field, value)
+        logger.debug(f"Índice de busca carregado de {self.index_file}")
+        return True
+
+    def _save_index(self):
+        """
+        Salva o índice em disco para as próximas execuções.
+
+        A escrita vai para um arquivo temporário renomeado ao final, então
+        outro processo nunca lê um índice pela metade. Falhas (ex: diretório
+        somente leitura) apenas desativam a reutilização.
+        """
+        signature = self._data_signature()
+        if signature is None:
+            return
+
+        state = tuple(getattr(self, field) for field in self._INDEX_FIELDS)
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.index_file) or ".", suffix=".tmp")
+        except OSError as e:
+            logger.warning(f"Não foi possível salvar o índice de busca em {self.index_file}: {e}")
+            return
+
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump((signature, state), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.index_file)
+        except OSError as e:
+            os.unlink(tmp_path)
+            logger.warning(f"Não foi possível salvar o índice de busca em {self.index_file}: {e}")
+
+    def search_gpu_pricing(self, query: str = "", gpu_type: str = "", min_gpu_count: int = 0,
+                           max_price: float = 0.0) -> str:
         """
         Método principal: realiza busca por preços de GPU.
 
@@ -63,50 +233,115 @@ class MockSearchTool:
         Representa uma "ferramenta externa" que o LLM pode invocar.
 
         Algoritmo de busca:
-        1. Converte query para minúsculas
-        2. Itera sobre todos os dados (provedores -> categorias -> itens)
-        3. Verifica se query aparece em qualquer campo do item
-        4. Retorna até 5 resultados mais relevantes
+        1. Converte query para minúsculas e separa em termos
+        2. Consulta a lista de instâncias de cada termo no índice invertido
+        3. Mantém as instâncias que contêm todos os termos (interseção)
+        4. Sem resultado, procura a query como trecho do texto de cada instância
+        5. Sem resultado, ranqueia instâncias por quantos termos contêm
+        6. Aplica os filtros numéricos como uma máscara booleana vetorizada
+        7. Retorna até 5 resultados, na ordem dos dados (ou do ranking)
+
+        Sem query, a busca considera todas as instâncias que passam nos filtros.
 
         Args:
             query: String de busca (ex: "AWS V100", "GPU pricing", etc.)
+            gpu_type: Filtra pelo tipo exato de GPU (ex: "V100"); vazio não filtra
+            min_gpu_count: Quantidade mínima de GPUs; 0 não filtra
+            max_price: Preço máximo por hora (USD); 0 não filtra
 
         Returns:
             str: JSON com resultados da busca ou mensagem de erro
         """
-        logger.info(f"Iniciando busca por: '{query}'")
-        results = []
+        logger.debug(f"Iniciando busca por: '{query}'")
 
-        # Normaliza query para busca case-insensitive
-        query_lower = query.lower()
+        # Normaliza query para busca case-insensitive (e chave do cache)
+        return self._search_cached(
+            " ".join(query.lower().split()), gpu_type.strip().upper(), int(min_gpu_count), float(max_price)
+        )
 
-        # Itera sobre estrutura de dados: provider -> category -> items
-        # Exemplo: AWS -> GPU_Instances -> [lista de instâncias]
-        for provider, categories in self.data.items():
-            for category, items in categories.items():
-                for item in items:
-                    # Converte item completo para string e busca
-                    # Isso permite buscar por qualquer campo (nome, tipo, preço, etc.)
-                    item_str = json.dumps(item, ensure_ascii=False).lower()
-                    if query_lower in item_str:
-                        # Adiciona resultado com contexto
-                        results.append({
-                            "provider": provider,      # AWS, Azure, GCP
-                            "category": category,      # GPU_Instances, etc.
-                            "data": item              # Dados completos da instância
-                        })
+    def _filter_mask(self, gpu_type: str, min_gpu_count: int, max_price: float):
+        """
+        Monta a máscara booleana dos filtros sobre as colunas numpy.
+
+        Returns:
+            np.ndarray | None: Máscara com uma posição por instância, ou None
+                se nenhum filtro foi informado
+        """
+        if not (gpu_type or min_gpu_count or max_price):
+            return None
+
+        mask = np.ones(len(self._items), dtype=bool)
+        if gpu_type:
+            mask &= self._gpu_types == gpu_type
+        if min_gpu_count:
+            mask &= self._gpu_counts >= min_gpu_count
+        if max_price:
+            mask &= self._prices <= max_price
+        return mask
+
+    def _search(self, query: str, gpu_type: str = "", min_gpu_count: int = 0, max_price: float = 0.0) -> str:
+        """
+        Executa a busca para uma query já normalizada (usado via _search_cached).
+
+        Args:
+            query: Query em minúsculas, com espaços colapsados
+            gpu_type: Tipo de GPU em maiúsculas; vazio não filtra
+            min_gpu_count: Quantidade mínima de GPUs; 0 não filtra
+            max_price: Preço máximo por hora; 0 não filtra
+
+        Returns:
+            str: JSON com resultados da busca ou mensagem de erro
+        """
+        terms = query.split()
+        mask = self._filter_mask(gpu_type, min_gpu_count, max_price)
+
+        def allowed(ids):
+            # Mantém só as instâncias que passam nos filtros, preservando a
+            # ordem, e para de consumir `ids` ao atingir MAX_RESULTS
+            if mask is not None:
+                ids = (item_id for item_id in ids if mask[item_id])
+            return list(islice(ids, MAX_RESULTS))
+
+        # Interseção dos conjuntos do índice: instâncias com todos os termos,
+        # em qualquer ordem. Começa pelo menor conjunto, então o custo é
+        # proporcional ao termo mais raro (e um termo ausente encerra cedo)
+        term_postings = sorted((self._postings.get(term, frozenset()) for term in set(terms)), key=len)
+        matches = term_postings[0].intersection(*term_postings[1:]) if term_postings else frozenset()
+        # (ids em ordem crescente preservam a ordem original dos dados)
+        item_ids = allowed(sorted(matches))
+
+        # Sem query: todas as instâncias que passam nos filtros
+        if not query and mask is not None:
+            item_ids = np.flatnonzero(mask)[:MAX_RESULTS].tolist()
+
+        # Sem termos completos em comum: procura a query como trecho do
+        # texto pré-computado de cada instância
+        if not item_ids and query:
+            item_ids = allowed(item_id for item_id, blob in enumerate(self._blobs) if query in blob)
+
+        # Query com vários termos que nenhuma instância contém por inteiro
+        # (ex: "AWS V100 barato"): ranqueia por quantos termos distintos cada
+        # instância contém, em uma única varredura por texto com uma
+        # alternância compilada (termos mais longos primeiro)
+        if not item_ids and len(terms) > 1:
+            pattern = re.compile("|".join(map(re.escape, sorted(set(terms), key=len, reverse=True))))
+            scores = [(len(set(pattern.findall(blob))), item_id) for item_id, blob in enumerate(self._blobs)]
+            item_ids = allowed(
+                item_id for score, item_id in sorted(scores, key=lambda entry: (-entry[0], entry[1])) if score
+            )
+
+        # Registros pré-montados das instâncias aprovadas (no máximo MAX_RESULTS)
+        results = [self._items[item_id] for item_id in item_ids]
 
         # Verifica se encontrou resultados
         if not results:
-            logger.info(f"Nenhum resultado encontrado para: {query}")
-            return json.dumps({
+            logger.debug(f"Nenhum resultado encontrado para: {query}")
+            return orjson.dumps({
                 "mensagem": f"Nenhum resultado encontrado para: {query}",
                 "query": query
-            })
+            }).decode()
 
-        # Limita a 5 resultados para não sobrecarregar o LLM
-        limited_results = results[:5]
-        logger.info(f"Encontrados {len(limited_results)} resultados para: {query}")
+        logger.debug(f"Encontrados {len(results)} resultados para: {query}")
 
-        # Retorna JSON formatado para o agente
-        return json.dumps(limited_results, ensure_ascii=False, indent=2)
+        # Retorna JSON compacto para o agente (indentação não ajuda o LLM)
+        return orjson.dumps(results).decode()
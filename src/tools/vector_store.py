@@ -12,11 +12,63 @@ Responsabilidades:
 """
 import chromadb
 from chromadb.config import Settings
-import json
-import uuid
+from chromadb.utils import embedding_functions
+from concurrent.futures import Future, ThreadPoolExecutor
+import functools
+import hashlib
+import os
+import re
+import threading
+import numpy as np
+import orjson
 from loguru import logger
 
 
+# Parâmetros do índice HNSW (busca aproximada de vizinhos) da coleção:
+# - space: cosseno, compatível com os embeddings normalizados
+# - M: conexões por nó do grafo (mais = melhor recall, mais memória)
+# - construction_ef: qualidade do grafo na ingestão
+# Mantém a latência de busca sublinear quando a base crescer para milhares
+# de documentos. Aplicado apenas ao criar a coleção.
+HNSW_METADATA = {
+    "hnsw:space": "cosine",
+    "hnsw:M": 16,
+    "hnsw:construction_ef": 200,
+}
+
+# Filtros de metadados reconhecidos na query: restringem a busca vetorial
+# aos documentos do provedor (ou do tema) citado antes do cálculo de
+# distâncias. Uma única expressão com grupos nomeados resolve o filtro em
+# uma só varredura da query
+_METADATA_FILTER_RE = re.compile(
+    r"\b(?:(?P<provider>aws|azure|gcp)|(?P<cost_optimization>economi\w*|otimiza\w*|spot|reserved))\b"
+)
+_PROVIDER_FILTERS = {"aws": "AWS", "azure": "Azure", "gcp": "GCP"}
+
+
+def _metadata_filter(query: str):
+    """
+    Monta o filtro `where` do ChromaDB a partir de uma query em minúsculas.
+
+    O primeiro provedor ou tema citado na query define o filtro.
+
+    Returns:
+        dict | None: Filtro por provedor ou tema, ou None se a query não cita nenhum
+    """
+    match = _METADATA_FILTER_RE.search(query)
+    if match is None:
+        return None
+    if match.lastgroup == "provider":
+        return {"provider": _PROVIDER_FILTERS[match.group("provider")]}
+    return {"topic": match.lastgroup}
+
+# Carga inicial de cada coleção, por (diretório, nome da coleção), compartilhada
+# por todas as instâncias do processo: só a primeira que encontra a coleção
+# vazia a popula, e todas aguardam o mesmo Future antes de consultar
+_populate_lock = threading.Lock()
+_populate_futures: dict[tuple[str, str], Future] = {}
+
+
 class VectorStoreTool:
     """
     Base de conhecimento vetorial usando ChromaDB.
@@ -32,14 +84,17 @@ class VectorStoreTool:
         collection: Objeto da coleção ChromaDB
     """
 
-    def __init__(self, persist_directory: str = "./data/chromadb"):
+    def __init__(self, persist_directory: str = "./data/chromadb", ef_search: int = 64):
         """
         Inicializa a base de conhecimento vetorial.
 
         Args:
             persist_directory: Caminho onde dados serão persistidos
+            ef_search: Tamanho da lista de candidatos do HNSW na busca
+                (maior = melhor recall, busca mais lenta)
         """
         self.persist_directory = persist_directory
+        self.ef_search = ef_search
 
         # Cria cliente ChromaDB com persistência local
         # Desabilita telemetria para privacidade
@@ -51,6 +106,20 @@ class VectorStoreTool:
         # Nome da coleção que armazenará nossos documentos
         self.collection_name = "cloud_pricing_docs"
 
+        # Uma única instância da função de embedding (modelo padrão do ChromaDB)
+        # reutilizada na ingestão e nas consultas
+        self._embedding_fn = embedding_functions.DefaultEmbeddingFunction()
+
+        # Cache de embeddings de queries: perguntas repetidas não passam
+        # de novo pelo modelo de embedding
+        self.embed_cached = functools.lru_cache(maxsize=2048)(self._embed)
+
+        # Cache dos resultados de search_similar por (query normalizada,
+        # n_results): evita embedding e consulta ao ChromaDB em repetições.
+        # Toda consulta aguarda a carga inicial (ver _wait_populated), então
+        # nenhum resultado de uma coleção ainda incompleta entra no cache
+        self._search_cached = functools.lru_cache(maxsize=512)(self._search_similar)
+
         # Inicializa ou carrega coleção existente
         self._initialize_collection()
 
@@ -62,20 +131,64 @@ class VectorStoreTool:
         Se não existir, cria uma nova e popula com dados iniciais.
 
         Processo:
-        1. Tenta carregar coleção existente
-        2. Se não existir, cria nova coleção
-        3. Popula com documentos de conhecimento básico
-        """
-        try:
-            # Tenta carregar coleção existente
-            self.collection = self.client.get_collection(self.collection_name)
-            logger.info("Coleção existente de conhecimento carregada")
-        except:
-            # Coleção não existe, criar nova
-            self.collection = self.client.create_collection(self.collection_name)
-            # Popula com dados iniciais de conhecimento
-            self._populate_initial_data()
-            logger.info("Nova coleção de conhecimento criada")
+        1. Carrega a coleção, criando-a se não existir (uma única chamada,
+           sem depender de exceção para detectar a ausência)
+        2. Se estiver vazia, popula com documentos de conhecimento básico,
+           em uma thread de fundo: a inicialização do agente não espera os
+           embeddings, só a primeira busca (ver _wait_populated)
+
+        A carga é registrada por coleção em _populate_futures: outras
+        instâncias no mesmo diretório reutilizam a carga em andamento em
+        vez de iniciar outra, e também aguardam por ela antes de buscar.
+        """
+        # O metadata do HNSW só é aplicado quando a coleção é criada
+        self.collection = self.client.get_or_create_collection(
+            self.collection_name,
+            embedding_function=self._embedding_fn,
+            metadata={**HNSW_METADATA, "hnsw:search_ef": self.ef_search}
+        )
+
+        # Carga (em andamento ou concluída) aguardada pelas buscas desta instância
+        self._populate_key = (os.path.abspath(self.persist_directory), self.collection_name)
+        self._populate_future = self._schedule_populate()
+
+    def _schedule_populate(self) -> Future:
+        """
+        Retorna a carga inicial registrada para a coleção, iniciando-a se preciso.
+
+        Uma carga que falhou (ex: o download do modelo de embedding) é
+        substituída por uma nova tentativa, em vez de ficar registrada e
+        repetir a mesma exceção em todas as buscas do processo.
+
+        Returns:
+            Future: Carga da coleção (concluída se a coleção já tem documentos)
+        """
+        with _populate_lock:
+            future = _populate_futures.get(self._populate_key)
+            if future is None or (future.done() and future.exception() is not None):
+                if self.collection.count() > 0:
+                    # Coleção já populada: nada a aguardar
+                    future = Future()
+                    future.set_result(None)
+                    logger.info("Coleção existente de conhecimento carregada")
+                else:
+                    # Popula com dados iniciais de conhecimento, sem bloquear quem criou a ferramenta
+                    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vector-store-populate")
+                    future = executor.submit(self._populate_initial_data)
+                    executor.shutdown(wait=False)
+                    logger.info("Nova coleção de conhecimento criada")
+                _populate_futures[self._populate_key] = future
+        return future
+
+    def _wait_populated(self):
+        """Aguarda a carga inicial da coleção, se ainda estiver em andamento."""
+        future = self._populate_future
+        if future.done() and future.exception() is not None:
+            # A carga anterior falhou: a busca atual dispara uma nova tentativa
+            future = self._populate_future = self._schedule_populate()
+        # result() propaga uma eventual falha da carga para a busca (e
+        # exceções não entram no lru_cache de resultados)
+        future.result()
 
     def _populate_initial_data(self):
         """
@@ -91,38 +204,150 @@ class VectorStoreTool:
         """
         documents = [
             {
-                "id": str(uuid.uuid4()),
                 "content": "AWS P3 instances com V100 GPUs para machine learning. Preços: P3.2xlarge $3.06/h, P3.8xlarge $12.24/h.",
                 "metadata": {"provider": "AWS", "gpu_type": "V100"}
             },
             {
-                "id": str(uuid.uuid4()),
                 "content": "Azure NC series com K80 GPUs. Preços: NC6 $0.90/h, NC12 $1.80/h, NC24 $3.60/h.",
                 "metadata": {"provider": "Azure", "gpu_type": "K80"}
             },
             {
-                "id": str(uuid.uuid4()),
                 "content": "GCP com K80 GPUs. Preços: n1-standard-8 $0.70/h, n1-standard-16 $1.40/h.",
                 "metadata": {"provider": "GCP", "gpu_type": "K80"}
             },
             {
-                "id": str(uuid.uuid4()),
                 "content": "Dicas de economia: Use spot instances, escolha tamanho correto, considere reserved instances.",
                 "metadata": {"topic": "cost_optimization"}
             }
         ]
 
         # Extrai dados para o formato esperado pelo ChromaDB
-        ids = [doc["id"] for doc in documents]
         contents = [doc["content"] for doc in documents]
         metadatas = [doc["metadata"] for doc in documents]
+        # Ids derivados do conteúdo: se mais de uma instância (ou processo)
+        # encontrar a coleção vazia e popular ao mesmo tempo, o upsert
+        # regrava os mesmos documentos em vez de duplicá-los
+        ids = [hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest() for content in contents]
 
-        # Adiciona documentos à coleção
-        # ChromaDB criará embeddings automaticamente
-        self.collection.add(documents=contents, metadatas=metadatas, ids=ids)
+        # Grava os documentos na coleção com embeddings já normalizados (L2),
+        # assim a distância na consulta equivale à similaridade de cosseno
+        self.collection.upsert(
+            documents=contents,
+            embeddings=self._embed_normalized(contents).tolist(),
+            metadatas=metadatas,
+            ids=ids
+        )
         logger.info(f"Base de conhecimento populada com {len(documents)} documentos")
 
-    def search_similar(self, query: str) -> str:
+    def _embed_normalized(self, texts: list[str]) -> np.ndarray:
+        """
+        Gera embeddings L2-normalizados para uma lista de textos.
+
+        Args:
+            texts: Textos a converter em vetores
+
+        Returns:
+            np.ndarray: Matriz (len(texts), dimensão) com vetores unitários
+        """
+        vectors = np.asarray(self._embedding_fn(texts), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def _embed(self, query: str) -> tuple[float, ...]:
+        """
+        Gera o embedding normalizado de uma query.
+
+        Usado através de embed_cached; retorna uma tupla (imutável) para que
+        o valor em cache não possa ser alterado por quem o consome.
+        """
+        return tuple(self._embed_normalized([query])[0].tolist())
+
+    def search_by_vector(self, embedding, n_results: int = 2, query: str = "", where=None) -> str:
+        """
+        Realiza busca na base de conhecimento a partir de um embedding pronto.
+
+        Permite pular a etapa de embedding quando o vetor da query já foi
+        calculado (ver embed_cached).
+
+        Args:
+            embedding: Vetor normalizado da query
+            n_results: Quantidade de documentos a retornar
+            query: Texto original da query (usado apenas em mensagens/logs)
+            where: Filtro de metadados opcional do ChromaDB (ex: {"provider": "AWS"})
+
+        Returns:
+            str: JSON com documentos relevantes encontrados
+        """
+        return self._query_vectors([list(embedding)], n_results, [query], where=where)[0]
+
+    def _query_vectors(self, embeddings: list, n_results: int, queries: list[str], where=None) -> list[str]:
+        """
+        Consulta o ChromaDB com vários embeddings em uma única chamada.
+
+        Args:
+            embeddings: Vetores normalizados, um por query
+            n_results: Quantidade de documentos a retornar por query
+            queries: Textos originais das queries (usados apenas em mensagens/logs)
+            where: Filtro de metadados opcional, aplicado a todas as queries
+
+        Returns:
+            list[str]: JSON com os documentos relevantes de cada query, na mesma ordem
+        """
+        self._wait_populated()
+        results = self.collection.query(query_embeddings=embeddings, n_results=n_results, where=where)
+
+        documents = results.get("documents") or [[] for _ in queries]
+        metadatas = results.get("metadatas") or [[] for _ in queries]
+
+        outputs = []
+        for query, docs, metas in zip(queries, documents, metadatas):
+            # Verifica se encontrou documentos
+            if not docs:
+                logger.debug(f"Nenhum documento relevante encontrado para: {query}")
+                outputs.append(orjson.dumps({
+                    "mensagem": f"Nenhum documento relevante encontrado para: {query}",
+                    "query": query
+                }).decode())
+                continue
+
+            # Combina conteúdo + metadados em formato estruturado
+            formatted_results = [
+                {
+                    "conteudo": doc,    # Texto completo do documento
+                    "metadata": meta    # Informações contextuais
+                }
+                for doc, meta in zip(docs, metas)
+            ]
+
+            logger.debug(f"Encontrados {len(formatted_results)} documentos relevantes")
+            # Retorna JSON compacto para o agente (indentação não ajuda o LLM)
+            outputs.append(orjson.dumps(formatted_results).decode())
+
+        return outputs
+
+    def search_similar_batch(self, queries: list[str], n_results: int = 2) -> list[str]:
+        """
+        Realiza várias buscas semânticas de uma vez.
+
+        Todas as queries passam juntas pelo modelo de embedding (uma única
+        inferência em lote) e por uma única consulta ao ChromaDB, em vez de
+        uma ida ao modelo e ao banco por pergunta.
+
+        Args:
+            queries: Perguntas ou termos de busca
+            n_results: Quantidade de documentos a retornar por query
+
+        Returns:
+            list[str]: JSON com os documentos relevantes de cada query, na mesma ordem
+        """
+        if not queries:
+            return []
+
+        logger.debug(f"Busca semântica em lote com {len(queries)} queries")
+        normalized = [" ".join(query.lower().split()) for query in queries]
+        return self._query_vectors(self._embed_normalized(normalized).tolist(), n_results, normalized)
+
+    def search_similar(self, query: str, n_results: int = 2) -> str:
         """
         Método principal: realiza busca semântica na base de conhecimento.
 
@@ -130,41 +355,34 @@ class VectorStoreTool:
         geral sobre nuvem, melhores práticas, ou dicas de otimização.
 
         Como funciona a busca vetorial:
-        1. A query é convertida em embedding vetorial
+        1. A query é convertida em embedding vetorial (com cache)
         2. Busca documentos similares no espaço vetorial
         3. Retorna os mais relevantes (não apenas matches exatos)
 
         Args:
             query: Pergunta ou termo de busca (ex: "otimização de custos")
+            n_results: Quantidade de documentos a retornar
 
         Returns:
             str: JSON com documentos relevantes encontrados
         """
-        logger.info(f"Busca semântica por: '{query}'")
-
-        # Realiza busca vetorial - retorna 2 resultados mais similares
-        results = self.collection.query(query_texts=[query], n_results=2)
-
-        # Verifica se encontrou documentos
-        if not results.get("documents") or not results["documents"][0]:
-            logger.info(f"Nenhum documento relevante encontrado para: {query}")
-            return json.dumps({
-                "mensagem": f"Nenhum documento relevante encontrado para: {query}",
-                "query": query
-            })
-
-        # Formatar resposta para o agente
-        docs = results["documents"][0]      # Lista de conteúdos
-        metadatas = results["metadatas"][0] # Lista de metadados
-
-        # Combina conteúdo + metadados em formato estruturado
-        formatted_results = []
-        for doc, meta in zip(docs, metadatas):
-            formatted_results.append({
-                "conteudo": doc,    # Texto completo do documento
-                "metadata": meta    # Informações contextuais
-            })
-
-        logger.info(f"Encontrados {len(formatted_results)} documentos relevantes")
-        # Retorna JSON formatado para o agente
-        return json.dumps(formatted_results, ensure_ascii=False, indent=2)
+        logger.debug(f"Busca semântica por: '{query}'")
+
+        # O modelo de embedding padrão é case-insensitive, então a query
+        # normalizada (minúsculas, espaços colapsados) serve de chave do cache
+        return self._search_cached(" ".join(query.lower().split()), n_results)
+
+    def _search_similar(self, query: str, n_results: int) -> str:
+        """Busca vetorial sem cache (usada via _search_cached)."""
+        embedding = self.embed_cached(query)
+
+        # Query que cita um provedor ou tema conhecido: busca primeiro só nos
+        # documentos com esse metadado; sem acerto, cai na busca completa
+        where = _metadata_filter(query)
+        if where is not None:
+            result = self.search_by_vector(embedding, n_results, query=query, where=where)
+            if "mensagem" not in orjson.loads(result):
+                return result
+
+        # Realiza busca vetorial - por padrão retorna 2 resultados mais similares
+        return self.search_by_vector(embedding, n_results, query=query)
@@ -0,0 +1,58 @@
+"""
+Leitor mínimo de arquivos .env.
+
+O .env do projeto tem apenas linhas simples CHAVE=valor. Este leitor cobre
+esse formato (comentários, prefixo "export", aspas simples ou duplas,
+inclusive CHAVE="valor" # comentário) sem o custo de inicialização do
+python-dotenv, que analisa cada linha com expressões regulares para
+suportar recursos que o projeto não usa (interpolação de variáveis,
+valores multilinha).
+"""
+import os
+
+
+def load(dotenv_path: str) -> bool:
+    """
+    Carrega as variáveis de um arquivo .env em os.environ.
+
+    Assim como load_dotenv, variáveis já definidas no ambiente não são
+    sobrescritas.
+
+    Args:
+        dotenv_path: Caminho do arquivo .env
+
+    Returns:
+        bool: True se o arquivo existia e foi lido
+    """
+    try:
+        with open(dotenv_path, encoding="utf-8") as f:
+            content = f.read()
+    except FileNotFoundError:
+        return False
+
+    for line in content.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("export "):
+            line = line[len("export "):]
+
+        key, sep, value = line.partition("=")
+        key = key.strip()
+        if not sep or not key:
+            continue
+
+        value = value.strip()
+        closing = value.find(value[0], 1) if value[:1] in ("\"", "'") else -1
+        if closing != -1:
+            # Valor entre aspas: o conteúdo é mantido literalmente (inclusive
+            # "#"), e o que vem depois da aspa de fechamento é descartado,
+            # como no python-dotenv (ex: CHAVE="valor" # comentário -> valor)
+            value = value[1:closing]
+        else:
+            # Valor sem aspas: " #" inicia um comentário no fim da linha
+            value = value.split(" #", 1)[0].rstrip()
+
+        os.environ.setdefault(key, value)
+
+    return True
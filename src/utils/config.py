@@ -2,10 +2,18 @@
 Configuração simples para o agente IA.
 """
 import os
-from dotenv import load_dotenv
 
-# Carrega variáveis de ambiente do arquivo .env no diretório raiz
-load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '..', '.env'))
+from ._fastenv import load as load_dotenv
+
+# Variáveis de ambiente lidas por Config
+_ENV_KEYS = ("OPENAI_API_KEY", "VERBOSE_LOGS", "AGENT_POOL_SIZE", "API_WORKERS", "AGENT_API_URL")
+
+# Carrega variáveis de ambiente do arquivo .env no diretório raiz.
+# Quando o ambiente já traz todas elas (Docker Compose, gerenciador de
+# processos), o arquivo não acrescentaria nada e não é lido; variáveis já
+# definidas nunca são sobrescritas pelo .env
+if not all(key in os.environ for key in _ENV_KEYS):
+    load_dotenv(os.path.join(os.path.dirname(__file__), '..', '..', '.env'))
 
 class Config:
     """Configuração básica da aplicação."""
@@ -16,8 +24,26 @@ class Config:
     # Configurações básicas
     CHROMA_DB_PATH: str = "./data/chromadb"
     LOG_LEVEL: str = "INFO"
+
+    # Logs detalhados do servidor (uma linha de acesso por requisição);
+    # desligados por padrão, pois custam tempo em cada requisição
+    VERBOSE_LOGS: bool = os.getenv("VERBOSE_LOGS", "").lower() in ("1", "true", "yes")
     EXTERNAL_API_URL: str = "http://localhost:8001"
 
+    # Quantidade de agentes pré-inicializados no pool da API
+    AGENT_POOL_SIZE: int = int(os.getenv("AGENT_POOL_SIZE", "4"))
+
+    # Processos (workers) do uvicorn servindo a API. Só 1 é suportado: o
+    # PersistentClient do ChromaDB (base de conhecimento e cache semântico,
+    # ambos gravados em CHROMA_DB_PATH) não é seguro entre processos, e cada
+    # worker carregaria o próprio modelo de embedding (ONNX, centenas de MB
+    # de memória) além do seu pool de agentes. Para escalar, aumente
+    # AGENT_POOL_SIZE (os agentes do pool compartilham as ferramentas)
+    API_WORKERS: int = int(os.getenv("API_WORKERS", "1"))
+
+    # API local já em execução, usada pela CLI para não recriar o agente
+    AGENT_API_URL: str = os.getenv("AGENT_API_URL", "http://localhost:8000")
+
     @classmethod
     def validar(cls) -> bool:
         """Verifica se a configuração essencial está presente."""
@@ -2,26 +2,60 @@
 Configuração simples de logging.
 """
 import os
+import sys
 from loguru import logger
 
 from .config import Config
 
 
+# Indica se setup_logging já configurou os sinks neste processo
+_CONFIGURED = False
+
+
 def setup_logging():
-    """Configura logging básico."""
+    """
+    Configura logging básico.
+
+    Idempotente: chamadas repetidas (ex: CLI e scripts de teste que chamam
+    setup_logging mais de uma vez) não recriam o diretório nem registram
+    sinks duplicados, que gravariam cada mensagem duas vezes.
+    """
+    global _CONFIGURED
+    if _CONFIGURED:
+        return
+    _CONFIGURED = True
+
     # Cria diretório de logs se não existir
     os.makedirs("logs", exist_ok=True)
 
     # Remove logger padrão
     logger.remove()
 
-    # Adiciona logger no console
+    # Adiciona logger em arquivo
+    # enqueue=True: as mensagens vão para uma fila e são gravadas por uma
+    # thread em segundo plano, tirando a escrita em disco do caminho das
+    # requisições. A fila só serializa as escritas dentro de um processo:
+    # processos independentes gravando no mesmo arquivo disputariam a
+    # rotação e a limpeza. A API roda em um único processo (API_WORKERS > 1
+    # é recusado em api.py); com vários processos seria preciso um arquivo
+    # por PID ou logar só no stderr.
+    # backtrace/diagnose desligados evitam a formatação cara de exceções.
+    # Rotação, compressão (gz) e limpeza dos arquivos antigos também rodam
+    # nessa thread, sem travar quem está logando
     logger.add(
         "logs/agent.log",
         level=Config.LOG_LEVEL,
-        rotation="10 MB"
+        rotation="10 MB",
+        retention="1 week",
+        compression="gz",
+        enqueue=True,
+        backtrace=False,
+        diagnose=False
     )
 
+    # Apenas avisos e erros no console
+    logger.add(sys.stderr, level="WARNING", enqueue=True)
+
     logger.info("Logging configurado")
 
 
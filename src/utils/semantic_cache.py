@@ -0,0 +1,144 @@
+"""
+Cache semântico de respostas do agente.
+
+O cache exato (mesma query normalizada) não reconhece reformulações como
+"Preço da V100 na AWS" e "Quanto custa V100 na AWS?". Este cache guarda o
+embedding de cada pergunta respondida em uma coleção ChromaDB e devolve a
+resposta armazenada quando uma nova pergunta está próxima o suficiente
+(distância de cosseno abaixo do limite) e cita as mesmas entidades
+(provedores, GPUs), já que "V100 na AWS" e "V100 na Azure" têm embeddings
+quase idênticos mas respostas diferentes.
+"""
+import hashlib
+import time
+from typing import Callable, Optional, Sequence
+
+import chromadb
+from chromadb.config import Settings
+from loguru import logger
+
+from .config import Config
+
+
+class SemanticCache:
+    """
+    Cache de respostas indexado por similaridade entre perguntas.
+
+    Atributos:
+        embed: Função que converte texto em embedding normalizado
+        entities: Função que extrai as entidades da pergunta (ou None)
+        max_distance: Distância de cosseno máxima para considerar um acerto
+        ttl: Validade de cada resposta, em segundos
+        collection: Coleção ChromaDB com (embedding, pergunta, resposta)
+    """
+
+    # Candidatos avaliados por consulta: o vizinho mais próximo pode citar
+    # outra entidade enquanto o seguinte é a resposta certa
+    CANDIDATES = 3
+
+    def __init__(self, embed: Callable[[str], Sequence[float]], persist_directory: str = Config.CHROMA_DB_PATH,
+                 max_distance: float = 0.08, ttl: float = 3600,
+                 entities: Optional[Callable[[str], str]] = None):
+        """
+        Inicializa o cache semântico.
+
+        Args:
+            embed: Função de embedding (a mesma da base de conhecimento)
+            persist_directory: Diretório de persistência do ChromaDB
+            max_distance: Distância de cosseno máxima para um acerto
+                (0.08 equivale a similaridade > 0.92)
+            ttl: Validade de cada resposta, em segundos
+            entities: Função que extrai as entidades da pergunta; um acerto
+                só é aceito se as entidades forem iguais (None = não compara)
+        """
+        self.embed = embed
+        self.entities = entities
+        self.max_distance = max_distance
+        self.ttl = ttl
+
+        client = chromadb.PersistentClient(
+            path=persist_directory,
+            settings=Settings(anonymized_telemetry=False)
+        )
+        self.collection = client.get_or_create_collection(
+            "semantic_response_cache",
+            metadata={"hnsw:space": "cosine"}
+        )
+
+    @staticmethod
+    def _normalize(query: str) -> str:
+        """Padroniza a pergunta: minúsculas e espaços colapsados."""
+        return " ".join(query.lower().split())
+
+    def get(self, query: str) -> Optional[str]:
+        """
+        Busca a resposta de uma pergunta semanticamente equivalente.
+
+        Args:
+            query: Pergunta do usuário
+
+        Returns:
+            str | None: Resposta armazenada, ou None se não houver acerto válido
+        """
+        count = self.collection.count()
+        if count == 0:
+            return None
+
+        normalized = self._normalize(query)
+        results = self.collection.query(
+            query_embeddings=[list(self.embed(normalized))],
+            n_results=min(self.CANDIDATES, count),
+            include=["documents", "metadatas", "distances"]
+        )
+        entities = self.entities(normalized) if self.entities is not None else None
+
+        # Resultados em ordem crescente de distância
+        expired = []
+        hit = None
+        for entry_id, document, metadata, distance in zip(
+            results["ids"][0], results["documents"][0], results["metadatas"][0], results["distances"][0]
+        ):
+            if distance > self.max_distance:
+                break
+
+            # Respostas expiradas são removidas e tratadas como ausentes
+            if time.time() - metadata["created_at"] > self.ttl:
+                expired.append(entry_id)
+                continue
+
+            # Pergunta parecida sobre outro provedor/GPU não é um acerto
+            if entities is not None and metadata.get("entities", "") != entities:
+                continue
+
+            logger.debug(f"Acerto no cache semântico (distância {distance:.3f}): '{metadata['query']}'")
+            hit = document
+            break
+
+        if expired:
+            self.collection.delete(ids=expired)
+        return hit
+
+    def set(self, query: str, response: str) -> None:
+        """
+        Armazena a resposta de uma pergunta.
+
+        Args:
+            query: Pergunta do usuário
+            response: Resposta final do agente
+        """
+        normalized = self._normalize(query)
+        now = time.time()
+
+        # Remove as respostas expiradas: get só descarta as que aparecem entre
+        # os candidatos de uma consulta, e a coleção persiste entre execuções
+        self.collection.delete(where={"created_at": {"$lt": now - self.ttl}})
+
+        metadata = {"query": normalized, "created_at": now}
+        if self.entities is not None:
+            metadata["entities"] = self.entities(normalized)
+        self.collection.upsert(
+            ids=[hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()],
+            embeddings=[list(self.embed(normalized))],
+            documents=[response],
+            metadatas=[metadata]
+        )
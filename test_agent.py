@@ -4,18 +4,53 @@ Script de teste direto para o AI Cloud Pricing Agent.
 Testa o agente diretamente sem precisar da API FastAPI.
 Use este script para verificar se o agente está funcionando.
 """
+import asyncio
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+# Saída em UTF-8: respostas do LLM podem trazer caracteres que o console
+# padrão do Windows (cp1252) não codifica, interrompendo o teste
+sys.stdout.reconfigure(encoding="utf-8", errors="replace")
+
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
-from utils.config import Config
-from utils.logging_config import setup_logging
-from agents.cloud_pricing_agent import CloudPricingAgent
+from utils import Config, setup_logging
+from agents.cloud_pricing_agent import CloudPricingAgent, aclose_async_openai_client
 import time
 
+# Tamanho da prévia de cada resposta exibida pelo teste
+PREVIEW_CHARS = 300
+
+# Limite de tokens das respostas do LLM no teste (cobre a prévia com folga)
+PREVIEW_MAX_TOKENS = 200
+
+async def _run_query(agent, query):
+    """
+    Executa uma pergunta; retorna (pergunta, segundos, resposta ou exceção).
+
+    Usa o mesmo caminho da CLI (aanalyze_query), com a resposta do LLM
+    limitada a PREVIEW_MAX_TOKENS: o teste só exibe uma prévia, então não
+    há por que esperar a geração da resposta completa.
+    """
+    # Relógio monotônico: imune a ajustes do relógio do sistema (NTP) durante a chamada
+    start_time = time.perf_counter_ns()
+    try:
+        result = await agent.aanalyze_query(query, max_tokens=PREVIEW_MAX_TOKENS)
+    except Exception as e:
+        result = e
+    return query, (time.perf_counter_ns() - start_time) / 1e9, result
+
+async def _run_queries(agents, queries):
+    """Executa as perguntas em paralelo, cada uma com seu agente."""
+    try:
+        return await asyncio.gather(*(_run_query(agent, query) for agent, query in zip(agents, queries)))
+    finally:
+        # O loop do asyncio.run termina aqui: fecha o cliente OpenAI async dele
+        await aclose_async_openai_client()
+
 def test_basic_functionality():
     """Test basic agent functionality."""
     print("Testing AI Cloud Pricing Agent...")
@@ -29,14 +64,6 @@ def test_basic_functionality():
     setup_logging()
     print("[OK] Logging configurado")
 
-    # Test agent initialization
-    try:
-        agent = CloudPricingAgent()
-        print("[OK] Agente inicializado com sucesso")
-    except Exception as e:
-        print(f"[ERRO] Agente falhou ao inicializar: {e}")
-        return False
-
     # Test basic query
     test_queries = [
         "Quais instâncias de GPU estão disponíveis na AWS?",
@@ -44,63 +71,87 @@ def test_basic_functionality():
         "Quais são algumas estratégias de otimização de custos para GPUs na nuvem?"
     ]
 
-    for query in test_queries:
-        print(f"\nTestando pergunta: '{query}'")
-        try:
-            start_time = time.time()
-            response = agent.analyze_query(query)
-            end_time = time.time()
-
-            print(f"Tempo de resposta: {end_time - start_time:.2f}s")
-            print(f"Resposta: {response[:300]}...")
+    # Test agent initialization
+    # Um agente por pergunta: as perguntas rodam ao mesmo tempo e o agente
+    # Agno não deve ser compartilhado entre execuções simultâneas (a API
+    # usa um pool pelo mesmo motivo)
+    try:
+        agents = [CloudPricingAgent() for _ in test_queries]
+        print("[OK] Agente inicializado com sucesso")
+    except Exception as e:
+        print(f"[ERRO] Agente falhou ao inicializar: {e}")
+        return False
 
-        except Exception as e:
-            print(f"[ERRO] Query falhou: {e}")
+    # As perguntas esperam pela rede (chamadas ao LLM): dispara todas juntas,
+    # então o tempo total fica próximo ao da pergunta mais lenta
+    # O relatório das perguntas é montado em memória e escrito de uma vez,
+    # sem se intercalar com linhas do logger
+    lines = []
+    for query, elapsed, result in asyncio.run(_run_queries(agents, test_queries)):
+        lines.append(f"\nTestando pergunta: '{query}'")
+        if isinstance(result, Exception):
+            lines.append(f"[ERRO] Query falhou: {result}")
             continue
 
+        lines.append(f"Tempo de resposta: {elapsed:.2f}s")
+        lines.append(f"Resposta: {result[:PREVIEW_CHARS]}...")
+    sys.stdout.write("\n".join(lines) + "\n")
+
     print("\n[OK] Teste basico concluido!")
     return True
 
-def test_tools():
-    """Test individual tools."""
-    print("\nTestando ferramentas individuais...")
-
+def _check_search():
+    """Testa a ferramenta de busca; retorna (nome, ok, mensagem)."""
     from tools.search_tool import MockSearchTool
-    from tools.vector_store import VectorStoreTool
-    from tools.external_api import ExternalAPITool
 
-    # Test search tool
     try:
         search_tool = MockSearchTool()
         results_str = search_tool.search_gpu_pricing("AWS")  # Retorna string JSON
         # Verifica se a string não está vazia e é válida
         if results_str and len(results_str) > 10:  # Mais que apenas "{}" ou "[]"
-            print(f"[OK] Ferramenta de busca: Resposta obtida ({len(results_str)} chars)")
-        else:
-            print(f"[ERRO] Ferramenta de busca: Resposta vazia")
+            return "Ferramenta de busca", True, f"Resposta obtida ({len(results_str)} chars)"
+        return "Ferramenta de busca", False, "Resposta vazia"
     except Exception as e:
-        print(f"[ERRO] Ferramenta de busca falhou: {e}")
+        return "Ferramenta de busca", False, f"falhou: {e}"
+
+def _check_vector():
+    """Testa a base vetorial; retorna (nome, ok, mensagem)."""
+    from tools.vector_store import VectorStoreTool
 
-    # Test vector store
     try:
         vector_store = VectorStoreTool()
         # Testar busca no conhecimento - metodo correto
         results_str = vector_store.search_similar("GPU pricing")
         if results_str and len(results_str) > 10:
-            print(f"[OK] Vector store: Resposta obtida ({len(results_str)} chars)")
-        else:
-            print(f"[ERRO] Vector store: Resposta vazia")
+            return "Vector store", True, f"Resposta obtida ({len(results_str)} chars)"
+        return "Vector store", False, "Resposta vazia"
     except Exception as e:
-        print(f"[ERRO] Vector store falhou: {e}")
+        return "Vector store", False, f"falhou: {e}"
+
+def _check_api():
+    """Testa a API externa; retorna (nome, ok, mensagem)."""
+    from tools.external_api import ExternalAPITool
 
-    # Test external API
     try:
         external_api = ExternalAPITool()
         # Testar comparacao de precos - metodo correto
-        result = external_api.get_market_trends()
-        print(f"[OK] API externa: Dados obtidos")
+        external_api.get_market_trends()
+        return "API externa", True, "Dados obtidos"
     except Exception as e:
-        print(f"[ERRO] API externa falhou: {e}")
+        return "API externa", False, f"falhou: {e}"
+
+def test_tools():
+    """Test individual tools."""
+    print("\nTestando ferramentas individuais...")
+
+    # As ferramentas são independentes e o tempo é dominado por I/O (carga
+    # do ChromaDB, chamada externa): testa todas ao mesmo tempo e mostra
+    # cada resultado assim que fica pronto
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(check) for check in (_check_search, _check_vector, _check_api)]
+        for future in as_completed(futures):
+            name, ok, message = future.result()
+            print(f"{'[OK]' if ok else '[ERRO]'} {name}: {message}")
 
 def main():
     """Main test function."""
@@ -2,8 +2,19 @@
 """
 Script para testar se a API FastAPI está funcionando.
 """
+import orjson
 import requests
+import sys
 import time
+from requests.adapters import HTTPAdapter
+
+# Saída em UTF-8: as respostas do agente podem trazer caracteres que o
+# console padrão do Windows (cp1252) não codifica
+sys.stdout.reconfigure(encoding="utf-8", errors="replace")
+
+# Sessão única: as requisições reaproveitam a mesma conexão TCP (keep-alive)
+session = requests.Session()
+session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
 
 def test_api():
     """Testa os endpoints da API."""
@@ -15,10 +26,10 @@ def test_api():
     # Teste 1: Health check
     try:
         print("1. Testando endpoint /health...")
-        response = requests.get(f"{base_url}/health", timeout=5)
+        response = session.get(f"{base_url}/health", timeout=5)
         if response.status_code == 200:
             print("[OK] Health check: OK")
-            print(f"   Status: {response.json()}")
+            print(f"   Status: {orjson.loads(response.content)}")
         else:
             print(f"[ERRO] Health check falhou: {response.status_code}")
     except requests.exceptions.RequestException as e:
@@ -31,7 +42,7 @@ def test_api():
     # Teste 2: Endpoint raiz
     try:
         print("2. Testando endpoint /...")
-        response = requests.get(f"{base_url}/", timeout=5)
+        response = session.get(f"{base_url}/", timeout=5)
         if response.status_code == 200:
             print("[OK] Endpoint raiz: OK")
         else:
@@ -45,14 +56,15 @@ def test_api():
     try:
         print("3. Testando pergunta ao agente...")
         question = "Quanto custa GPU V100 na AWS?"
-        response = requests.post(
+        response = session.post(
             f"{base_url}/ask",
-            json={"question": question},
+            data=orjson.dumps({"question": question}),
+            headers={"Content-Type": "application/json"},
             timeout=30  # Mais tempo para resposta da IA
         )
 
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             print("[OK] Pergunta processada: OK")
             print(f"   Pergunta: {data['question']}")
             print(f"   Resposta: {data['answer'][:200]}...")